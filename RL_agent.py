@@ -2,7 +2,9 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 import numpy as np
+import random
 from baseGame import Connect4
+from board_encoder import DQN_INPUT_VERSION, encode_game
 
 class DQN(nn.Module):
     def __init__(self, input_size, output_size):
@@ -10,6 +12,8 @@ class DQN(nn.Module):
         self.fc1 = nn.Linear(input_size, 128)
         self.fc2 = nn.Linear(128, 64)
         self.fc3 = nn.Linear(64, output_size)
+        # Saved in the state dict so weights trained on another input layout are refused at load
+        self.register_buffer("input_version", torch.tensor(DQN_INPUT_VERSION))
 
     def forward(self, x):
         x = torch.relu(self.fc1(x))
@@ -50,10 +54,10 @@ class DQNAgent:
         batch = random.sample(self.memory, self.batch_size)
         states, actions, rewards, next_states, dones = zip(*batch)
 
-        states = torch.FloatTensor(states).to(self.device)
+        states = torch.FloatTensor(np.array(states)).to(self.device)
         actions = torch.LongTensor(actions).to(self.device)
         rewards = torch.FloatTensor(rewards).to(self.device)
-        next_states = torch.FloatTensor(next_states).to(self.device)
+        next_states = torch.FloatTensor(np.array(next_states)).to(self.device)
         dones = torch.FloatTensor(dones).to(self.device)
 
         current_q_values = self.policy_net(states).gather(1, actions.unsqueeze(1))
@@ -78,16 +82,18 @@ def train_dqn_agent(episodes=10000, update_target_every=100):
     agent = DQNAgent(state_size, action_size)
 
     for episode in range(episodes):
-        state = env.reset()
-        state = np.array(state).flatten()
+        env.reset()
+        # Player 1's fixed perspective: rewards are +1 whenever player 1 wins, so the
+        # state must not flip sides between a transition and its bootstrap target
+        state = encode_game(env, 1, turn_bit=False)
         done = False
         total_reward = 0
 
         while not done:
             valid_moves = env.get_valid_moves()
             action = agent.get_action(state, valid_moves)
-            next_state, reward, done, _ = env.make_move(action)
-            next_state = np.array(next_state).flatten()
+            _, _, reward, done = env.make_move(action)
+            next_state = encode_game(env, 1, turn_bit=False)
             agent.remember(state, action, reward, next_state, done)
             state = next_state
             total_reward += reward
@@ -0,0 +1,168 @@
+import threading
+from engine import Connect4Engine, SearchCancelled, canonical_key, mirror_move
+
+
+def position_key(game):
+    """Hashable key for a position, shared with its mirror image"""
+    return canonical_position(game)[0]
+
+
+def canonical_position(game):
+    """(position key, mirrored): mirrored positions store their moves mirrored"""
+    key, mirrored = canonical_key(game.board)
+    # The shape keeps equally sized boards (6x8 and 8x6) apart
+    return (game.board.shape, key + bytes([game.current_player])), mirrored
+
+
+class AIWorker:
+    """Computes computer moves on a background thread so the GUI loop never blocks"""
+
+    def __init__(self, engine_depth=None, notify=None):
+        """
+        Parameters:
+            engine_depth (int): Engine search depth (default: engine's MAX_DEPTH)
+            notify (callable): Called from the worker thread on search progress and when a move is ready
+        """
+        self.notify = notify
+        self.engine = Connect4Engine()
+        if engine_depth is not None:
+            self.engine.MAX_DEPTH = engine_depth
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.thread = None
+        self.stop_event = None
+        self.result = None
+        self.thinking = False
+        self.pondering = False
+        self.best_so_far = None
+        self.depth = 0
+        self.ponder_cache = {}  # position key -> (depth, move in the canonical orientation)
+
+    def _start(self, target, pondering=False):
+        """Run target(generation, stop_event) on a fresh thread"""
+        self.cancel()
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+            self.thinking = not pondering
+            self.pondering = pondering
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=target, args=(generation, self.stop_event), daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        """Abandon any search or pondering in progress"""
+        if self.thread is not None:
+            self.stop_event.set()
+            # Engine searches notice the event at the next node, so this join is short
+            self.thread.join()
+            self.thread = None
+        with self.lock:
+            self.generation += 1
+            self.result = None
+            self.thinking = False
+            self.pondering = False
+            self.best_so_far = None
+            self.depth = 0
+
+    def clear(self):
+        """Cancel and forget pondered positions, e.g. on reset"""
+        self.cancel()
+        self.ponder_cache.clear()
+
+    def poll(self):
+        """Return the finished move once, or None while still thinking"""
+        with self.lock:
+            move, self.result = self.result, None
+            return move
+
+    def think_engine(self, game):
+        """Search game with the engine, reusing a pondered answer when one is deep enough"""
+        key, mirrored = canonical_position(game)
+        cached = self.ponder_cache.get(key)
+        if cached is not None and cached[0] >= self.engine.MAX_DEPTH:
+            self.cancel()
+            with self.lock:
+                self.result = mirror_move(cached[1], game.cols) if mirrored else cached[1]
+            if self.notify is not None:
+                self.notify()
+            return
+
+        snapshot = game.copy()
+
+        def run(generation, stop_event):
+            def report(depth, move):
+                with self.lock:
+                    if generation != self.generation:
+                        return
+                    self.depth, self.best_so_far = depth, move
+                if self.notify is not None:
+                    self.notify()
+
+            try:
+                move = self.engine.search(snapshot, stop_event=stop_event, on_depth=report)
+            except SearchCancelled:
+                return
+            self._finish(generation, move)
+
+        self._start(run)
+
+    def think(self, game, choose_move):
+        """Run choose_move(game_copy) in the background, e.g. a NEAT or RL agent"""
+        snapshot = game.copy()
+
+        def run(generation, stop_event):
+            try:
+                move = choose_move(snapshot)
+            except Exception as e:
+                print(f"Error in AI move selection: {e}")
+                move = None
+            self._finish(generation, move)
+
+        self._start(run)
+
+    def _finish(self, generation, move):
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.result = move
+            self.thinking = False
+        if self.notify is not None:
+            self.notify()
+
+    def ponder(self, game):
+        """Use the human's thinking time to search the engine's reply to each of their moves"""
+        if game.is_game_over():
+            return
+        replies = sorted(game.get_valid_moves(), key=lambda col: abs(col - game.cols // 2))
+        snapshot = game.copy()
+
+        def run(generation, stop_event):
+            positions = {}
+            for col in replies:
+                child = snapshot.copy()
+                child.make_move(col)
+                if not child.is_game_over():
+                    # Mirror-image replies share one entry, so only one of them is searched
+                    key, mirrored = canonical_position(child)
+                    positions.setdefault(key, (child, mirrored))
+            self.engine.stop_event = stop_event
+            try:
+                # Deepen across all replies together so the likeliest get answers first
+                for depth in range(1, self.engine.MAX_DEPTH + 1):
+                    for key, (child, mirrored) in positions.items():
+                        if self.ponder_cache.get(key, (0, None))[0] >= depth:
+                            continue
+                        move = self.engine.get_best_move(child, depth)
+                        if mirrored and move is not None:
+                            move = mirror_move(move, child.cols)
+                        self.ponder_cache[key] = (depth, move)
+            except SearchCancelled:
+                pass
+            finally:
+                self.engine.stop_event = None
+            with self.lock:
+                if generation == self.generation:
+                    self.pondering = False
+
+        self._start(run, pondering=True)
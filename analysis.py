@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict
+from ai_worker import canonical_position, position_key
+from engine import Connect4Engine, SearchCancelled, mirror_move
+
+
+class PositionAnalyzer:
+    """Per-position evaluation cache with a background search that deepens the current position"""
+
+    def __init__(self, max_depth=6, notify=None, max_entries=4096):
+        """
+        Parameters:
+            max_depth (int): Deepest per-column search the analysis runs to
+            notify (callable): Called from the analysis thread after each completed depth
+            max_entries (int): Positions kept before the least recently used are dropped
+        """
+        self.max_depth = max_depth
+        self.notify = notify
+        self.max_entries = max_entries
+        self.engine = Connect4Engine()  # Separate from the GUI and AI worker engines
+        # position key -> {'eval', 'depth', 'scores'}, one entry per mirror pair with
+        # scores kept in the canonical orientation
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stop_event = None
+
+    def _entry(self, key):
+        """Cache entry for key, marked as most recently used; call with the lock held"""
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = self.cache[key] = {'eval': None, 'depth': 0, 'scores': {}}
+            if len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        return entry
+
+    def evaluation(self, game):
+        """Static evaluation for the side to move, computed once per position"""
+        key = position_key(game)
+        with self.lock:
+            entry = self._entry(key)
+            if entry['eval'] is not None:
+                return entry['eval']
+        evaluation = self.engine.evaluate_position(game, game.current_player)
+        with self.lock:
+            self._entry(key)['eval'] = evaluation
+        return evaluation
+
+    def lookup(self, game):
+        """(depth, {col: score}) of the deepest finished analysis of game, depth 0 if none"""
+        key, mirrored = canonical_position(game)
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return 0, {}
+            depth, scores = entry['depth'], entry['scores']
+        if mirrored:
+            scores = {mirror_move(col, game.cols): score for col, score in sorted(scores.items(), reverse=True)}
+        return depth, scores
+
+    def analyse(self, game):
+        """Deepen the analysis of game in the background, continuing from any cached depth"""
+        self.cancel()
+        key, mirrored = canonical_position(game)
+        with self.lock:
+            start_depth = self._entry(key)['depth'] + 1
+        if game.is_game_over() or start_depth > self.max_depth:
+            return
+        snapshot = game.copy()
+        stop_event = threading.Event()
+
+        def run():
+            engine = Connect4Engine()
+            engine.stop_event = stop_event
+            try:
+                for depth in range(start_depth, self.max_depth + 1):
+                    scores = engine.score_moves(snapshot, depth)
+                    if mirrored:
+                        scores = {mirror_move(col, snapshot.cols): score
+                                  for col, score in sorted(scores.items(), reverse=True)}
+                    with self.lock:
+                        entry = self._entry(key)
+                        if depth > entry['depth']:
+                            entry['depth'], entry['scores'] = depth, scores
+                    if self.notify is not None:
+                        self.notify()
+            except SearchCancelled:
+                pass
+
+        self.stop_event = stop_event
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        """Stop the background search; finished depths stay cached"""
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import random
+import numpy as np
+from baseGame import Connect4
+from board_encoder import encode_game
+from game_records import GameRecordWriter
+
+
+class RandomPlayer:
+    """Plays a uniformly random valid move"""
+
+    def get_move(self, game):
+        valid_moves = game.get_valid_moves()
+        return random.choice(valid_moves) if valid_moves else None
+
+
+class EnginePlayer:
+    """Adapts Connect4Engine to the arena's get_move(game) interface"""
+
+    def __init__(self, depth=None):
+        from engine import Connect4Engine
+        self.engine = Connect4Engine()
+        if depth is not None:
+            self.engine.MAX_DEPTH = int(depth)
+
+    def get_move(self, game):
+        return self.engine.get_best_move(game)
+
+
+class DQNPlayer:
+    """Adapts a trained DQN agent (.pth or .npz export) to get_move(game)"""
+
+    def __init__(self, model_path="connect4_dqn.npz"):
+        from play_against_rl import load_trained_agent
+        self.agent = load_trained_agent(model_path)
+        self.state = None
+
+    def supports(self, rows, cols):
+        """The network only fits the board size it was trained on"""
+        return rows * cols == self.agent.state_size and cols == self.agent.action_size
+
+    def get_move(self, game):
+        self.state = encode_game(game, 1, self.state, turn_bit=False)
+        return self.agent.get_action(self.state, game.get_valid_moves())
+
+
+def _neat_player(model_file=None):
+    from neat_player import NEATPlayer
+    return NEATPlayer(model_file=model_file) if model_file else NEATPlayer()
+
+
+# Player spec "name" or "name:arg" -> factory(arg); extend with register_player
+PLAYER_FACTORIES = {
+    "random": lambda arg=None: RandomPlayer(),
+    "engine": lambda arg=None: EnginePlayer(arg),
+    "neat": _neat_player,
+    "dqn": lambda arg=None: DQNPlayer(arg) if arg else DQNPlayer(),
+}
+
+
+def register_player(name, factory):
+    """Make a new engine available to the arena under a spec name"""
+    PLAYER_FACTORIES[name] = factory
+
+
+def create_player(spec):
+    """Build a player from a "name" or "name:arg" spec"""
+    name, _, arg = spec.partition(":")
+    if name not in PLAYER_FACTORIES:
+        raise ValueError(f"Unknown player '{name}', expected one of {sorted(PLAYER_FACTORIES)}")
+    return PLAYER_FACTORIES[name](arg) if arg else PLAYER_FACTORIES[name]()
+
+
+def generate_openings(plies, cols=7):
+    """All opening move sequences of the given length, as column strings"""
+    return ["".join(str(c) for c in seq) for seq in itertools.product(range(cols), repeat=plies)]
+
+
+def load_openings(path):
+    """Read an opening suite: one column string per line, '#' starts a comment"""
+    openings = []
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                openings.append(line)
+    return openings or [""]
+
+
+def schedule(specs, openings, mode="roundrobin", rounds=1):
+    """Lazily yield (game_id, first, second, opening) with colors swapped per opening"""
+    if mode == "gauntlet":
+        pairs = [(specs[0], other) for other in specs[1:]]
+    else:
+        pairs = list(itertools.combinations(specs, 2))
+    game_id = 0
+    for _ in range(rounds):
+        for opening in openings:
+            for a, b in pairs:
+                for first, second in ((a, b), (b, a)):
+                    yield game_id, first, second, opening
+                    game_id += 1
+
+
+def check_players(specs):
+    """Build every spec once, raising ValueError for any that cannot be created"""
+    for spec in specs:
+        try:
+            create_player(spec)
+        except Exception as e:
+            raise ValueError(f"Cannot create player '{spec}': {e}") from e
+
+
+_worker_players = {}
+_worker_seed = 0
+_worker_error = None
+
+
+def _init_worker(specs, seed):
+    """Build each player once per worker process"""
+    global _worker_seed, _worker_error
+    _worker_seed = seed
+    try:
+        for spec in specs:
+            _worker_players[spec] = create_player(spec)
+    except Exception as e:
+        # Raising here would make the pool restart the worker forever; fail its tasks instead
+        _worker_error = f"{type(e).__name__}: {e}"
+
+
+def play_match(task, rows=6, cols=7):
+    """Play one game from an opening and return its result record"""
+    if _worker_error is not None:
+        raise RuntimeError(f"Arena worker could not create its players: {_worker_error}")
+    game_id, first, second, opening = task
+    random.seed(_worker_seed + game_id)
+    np.random.seed((_worker_seed + game_id) % 2**32)
+    game = Connect4(rows, cols)
+    players = {1: first, 2: second}
+    moves = []
+    forfeit = None
+
+    for ch in opening:
+        col = int(ch)
+        if not game.is_valid_move(col):
+            break
+        game.make_move(col)
+        moves.append(col)
+
+    while not game.is_game_over():
+        spec = players[game.current_player]
+        try:
+            move = _worker_players[spec].get_move(game)
+        except Exception:
+            move = None
+        if move is None or not game.is_valid_move(int(move)):
+            forfeit = game.current_player
+            break
+        game.make_move(int(move))
+        moves.append(int(move))
+
+    if forfeit is not None:
+        winner = 3 - forfeit
+    else:
+        winner = None if game.winner is None else int(game.winner)
+    score = 0.5 if winner is None else (1.0 if winner == 1 else 0.0)
+    return {"game": game_id, "first": first, "second": second, "opening": opening,
+            "score": score, "winner": winner, "forfeit": forfeit,
+            "moves": "".join(str(m) for m in moves)}
+
+
+class EloTable:
+    """Incremental pairwise results with Bradley-Terry Elo and confidence intervals"""
+
+    SCALE = math.log(10) / 400
+
+    def __init__(self):
+        self.index = {}
+        self.games = np.zeros((0, 0))
+        self.points = np.zeros((0, 0))
+
+    def _player(self, name):
+        if name not in self.index:
+            n = len(self.index)
+            self.index[name] = n
+            self.games = np.pad(self.games, ((0, 1), (0, 1)))
+            self.points = np.pad(self.points, ((0, 1), (0, 1)))
+        return self.index[name]
+
+    def add(self, first, second, score):
+        """Record one game; score is first player's result (1, 0.5 or 0)"""
+        i, j = self._player(first), self._player(second)
+        self.games[i, j] += 1
+        self.games[j, i] += 1
+        self.points[i, j] += score
+        self.points[j, i] += 1 - score
+
+    def ratings(self, iterations=200, prior_games=1.0):
+        """Return {name: (elo, ci95, games, score)} fitted by maximum likelihood"""
+        n = len(self.index)
+        if n == 0:
+            return {}
+        # A virtual draw against an average opponent keeps perfect scores finite
+        games = self.games.sum(axis=1) + prior_games
+        points = self.points.sum(axis=1) + prior_games / 2
+        r = np.zeros(n)
+        for _ in range(iterations):
+            p = 1 / (1 + 10 ** ((r[None, :] - r[:, None]) / 400))
+            expected = (self.games * p).sum(axis=1) + prior_games / (1 + 10 ** (-r / 400))
+            variance = (self.games * p * (1 - p)).sum(axis=1) + prior_games * 0.25
+            step = (points - expected) / (self.SCALE * variance)
+            r += np.clip(step, -200, 200)
+            r -= r.mean()
+            if np.abs(step).max() < 1e-3:
+                break
+
+        p = 1 / (1 + 10 ** ((r[None, :] - r[:, None]) / 400))
+        information = self.SCALE ** 2 * ((self.games * p * (1 - p)).sum(axis=1) + prior_games * 0.25)
+        ci = 1.96 / np.sqrt(information)
+        return {name: (float(r[i]), float(ci[i]), int(games[i] - prior_games),
+                       float(self.points[i].sum()))
+                for name, i in self.index.items()}
+
+    def report(self):
+        """Format the current ratings as a table"""
+        lines = [f"{'Player':<30} {'Elo':>8} {'+/-':>7} {'Games':>8} {'Score':>7}"]
+        ratings = sorted(self.ratings().items(), key=lambda kv: -kv[1][0])
+        for name, (elo, ci, games, points) in ratings:
+            pct = 100 * points / games if games else 0
+            lines.append(f"{name:<30} {elo:>+8.1f} {ci:>7.1f} {games:>8} {pct:>6.1f}%")
+        return "\n".join(lines)
+
+
+def run_arena(specs, openings, mode="roundrobin", rounds=1, workers=None, log_path="arena.jsonl",
+              seed=0, report_every=1000, window=2000, records=None):
+    """
+    Play the schedule over a process pool, streaming results to a JSONL log.
+    If records is a directory, every game is also appended to a game record store there.
+    """
+    check_players(specs)
+    table = EloTable()
+    writer = GameRecordWriter(records) if records else None
+    tasks = schedule(specs, openings, mode, rounds)
+    played = 0
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(specs, seed)) as pool, \
+            open(log_path, "a") as log:
+        # Feed the pool in windows so the schedule is never materialised in full
+        while True:
+            chunk = list(itertools.islice(tasks, window))
+            if not chunk:
+                break
+            for result in pool.imap_unordered(play_match, chunk, chunksize=16):
+                log.write(json.dumps(result) + "\n")
+                if writer is not None:
+                    writer.append(bytes(int(c) for c in result["moves"]), result["winner"], metadata={
+                        k: result[k] for k in ("first", "second", "opening", "forfeit")})
+                table.add(result["first"], result["second"], result["score"])
+                played += 1
+                if played % report_every == 0:
+                    log.flush()
+                    if writer is not None:
+                        writer.flush()
+                    print(f"\nAfter {played} games:\n{table.report()}")
+    if writer is not None:
+        writer.close()
+    print(f"\nFinal after {played} games:\n{table.report()}")
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless Connect 4 tournament with Elo ratings")
+    parser.add_argument("players", nargs="+", help="Player specs, e.g. engine engine:3 neat dqn:connect4_dqn.npz random")
+    parser.add_argument("--mode", choices=["roundrobin", "gauntlet"], default="roundrobin",
+                        help="Gauntlet plays the first player against every other")
+    parser.add_argument("--openings", help="Opening suite file, one column string per line")
+    parser.add_argument("--opening-plies", type=int, default=2, help="Use every opening of this length")
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--log", default="arena.jsonl")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report-every", type=int, default=1000)
+    parser.add_argument("--records", help="Also store every game in this game record directory")
+    args = parser.parse_args()
+
+    if len(args.players) < 2:
+        parser.error("At least two players are required")
+    try:
+        check_players(args.players)
+    except ValueError as e:
+        parser.error(str(e))
+    openings = load_openings(args.openings) if args.openings else generate_openings(args.opening_plies)
+    run_arena(args.players, openings, args.mode, args.rounds, args.workers, args.log,
+              args.seed, args.report_every, records=args.records)
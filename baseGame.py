@@ -1,6 +1,9 @@
 import numpy as np
 
 class Connect4:
+    # No per-instance __dict__ and an int8 board: servers and tournaments hold many of these
+    __slots__ = ("rows", "cols", "board", "current_player", "game_over", "winner", "last_move")
+
     def __init__(self, rows=6, cols=7):
         if rows < 4 or cols < 4:
             raise ValueError("Board size must be at least 4x4")
@@ -9,7 +12,7 @@ class Connect4:
         self.reset()
 
     def reset(self):
-        self.board = np.zeros((self.rows, self.cols), dtype=int)
+        self.board = np.zeros((self.rows, self.cols), dtype=np.int8)
         self.current_player = 1
         self.game_over = False
         self.winner = None
@@ -24,8 +27,8 @@ class Connect4:
             return False, self.get_state(), -10, True
 
         for row in range(self.rows - 1, -1, -1):
-            if self.board[row][col] == 0:
-                self.board[row][col] = self.current_player
+            if self.board[row, col] == 0:
+                self.board[row, col] = self.current_player
                 self.last_move = (row, col)
                 break
 
@@ -35,19 +38,19 @@ class Connect4:
         return True, self.get_state(), reward, self.game_over
 
     def _check_winner(self, row, col):
-        player = self.board[row][col]
+        player = int(self.board[row, col])
         directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
         for dr, dc in directions:
             count = 1
             for i in range(1, 4):
                 r, c = row + i*dr, col + i*dc
-                if 0 <= r < self.rows and 0 <= c < self.cols and self.board[r][c] == player:
+                if 0 <= r < self.rows and 0 <= c < self.cols and self.board[r, c] == player:
                     count += 1
                 else:
                     break
             for i in range(1, 4):
                 r, c = row - i*dr, col - i*dc
-                if 0 <= r < self.rows and 0 <= c < self.cols and self.board[r][c] == player:
+                if 0 <= r < self.rows and 0 <= c < self.cols and self.board[r, c] == player:
                     count += 1
                 else:
                     break
@@ -57,7 +60,7 @@ class Connect4:
         return 0
 
     def is_valid_move(self, col):
-        return 0 <= col < self.cols and self.board[0][col] == 0 and not self.game_over
+        return 0 <= col < self.cols and self.board[0, col] == 0 and not self.game_over
 
     def get_valid_moves(self):
         return [col for col in range(self.cols) if self.is_valid_move(col)]
@@ -65,6 +68,27 @@ class Connect4:
     def is_game_over(self):
         return self.game_over
 
+    def is_board_full(self):
+        return not (self.board[0] == 0).any()
+
+    def copy(self, out=None):
+        """
+        Copy the game. Pass out, a game of the same size that is no longer needed,
+        to overwrite it in place instead of allocating a new board.
+        """
+        if out is not None and out.board.shape == self.board.shape:
+            game = out
+            game.board[...] = self.board
+        else:
+            game = Connect4.__new__(Connect4)
+            game.rows, game.cols = self.rows, self.cols
+            game.board = self.board.copy()
+        game.current_player = self.current_player
+        game.game_over = self.game_over
+        game.winner = self.winner
+        game.last_move = self.last_move
+        return game
+
     def render(self):
         for row in self.board:
             print("|" + "|".join([" " if cell == 0 else "X" if cell == 1 else "O" for cell in row]) + "|")
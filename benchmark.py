@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from baseGame import Connect4
+from arena import create_player
+
+# Each position lists the moves played from the empty board, the columns that keep the
+# game-theoretic result ("best") and exact solver scores for the side to move
+# (positive = win, larger = sooner; null = full column).
+DEFAULT_POSITIONS = os.path.join(os.path.dirname(__file__), "benchmark_positions.json")
+
+
+def load_positions(path=DEFAULT_POSITIONS, sets=None, difficulties=None):
+    """Load the reference position set, optionally filtered"""
+    with open(path) as f:
+        positions = json.load(f)
+    if sets:
+        positions = [p for p in positions if p["set"] in sets]
+    if difficulties:
+        positions = [p for p in positions if p["difficulty"] in difficulties]
+    return positions
+
+
+def position_game(moves, rows=6, cols=7):
+    """Replay a column string into a fresh game"""
+    game = Connect4(rows, cols)
+    for ch in moves:
+        game.make_move(int(ch))
+    return game
+
+
+def _node_counter(player):
+    """The object carrying a `nodes` counter, if the engine keeps one"""
+    for obj in (player, getattr(player, "engine", None)):
+        if obj is not None and hasattr(obj, "nodes"):
+            return obj
+    return None
+
+
+def _clear_caches(player):
+    """Reset any search caches so each timed run starts cold"""
+    for obj in (player, getattr(player, "engine", None)):
+        if obj is not None and hasattr(obj, "clear_caches"):
+            obj.clear_caches()
+
+
+def run_position(player, position, memory=True, repeat=3):
+    """Search one position and return its measurements (best time of `repeat` runs)"""
+    counter = _node_counter(player)
+    elapsed = float("inf")
+    for _ in range(repeat):
+        if counter is not None:
+            counter.nodes = 0
+        _clear_caches(player)
+        game = position_game(position["moves"])
+        start = time.perf_counter()
+        move = player.get_move(game)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    nodes = counter.nodes if counter is not None else None
+
+    peak = None
+    if memory:
+        # Separate untimed pass: tracemalloc slows allocation-heavy search considerably
+        _clear_caches(player)
+        game = position_game(position["moves"])
+        tracemalloc.start()
+        player.get_move(game)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {"id": position["id"], "set": position["set"], "difficulty": position["difficulty"],
+            "move": None if move is None else int(move), "correct": move in position["best"],
+            "time": elapsed, "nodes": nodes, "peak_bytes": peak}
+
+
+def summarize(records):
+    """Aggregate per-position records into accuracy, speed and memory figures"""
+    nodes = [r["nodes"] for r in records if r["nodes"] is not None]
+    total_time = sum(r["time"] for r in records)
+    peaks = [r["peak_bytes"] for r in records if r["peak_bytes"] is not None]
+    return {
+        "positions": len(records),
+        "accuracy": sum(r["correct"] for r in records) / len(records) if records else 0.0,
+        "total_time": total_time,
+        "mean_time": total_time / len(records) if records else 0.0,
+        "max_time": max((r["time"] for r in records), default=0.0),
+        "nodes": sum(nodes) if nodes else None,
+        "nodes_per_sec": sum(nodes) / total_time if nodes and total_time > 0 else None,
+        "peak_bytes": max(peaks) if peaks else None,
+    }
+
+
+def run_benchmark(spec="engine", positions=None, memory=True, repeat=3):
+    """Benchmark one player spec over a position set"""
+    positions = positions if positions is not None else load_positions()
+    player = create_player(spec)
+    records = [run_position(player, position, memory, repeat) for position in positions]
+
+    groups = {}
+    for record in records:
+        groups.setdefault(f"set:{record['set']}", []).append(record)
+        groups.setdefault(f"difficulty:{record['difficulty']}", []).append(record)
+    summary = {"all": summarize(records)}
+    summary.update({name: summarize(group) for name, group in sorted(groups.items())})
+
+    return {"engine": spec, "python": platform.python_version(),
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "summary": summary, "positions": records}
+
+
+def compare(results, baseline, tolerance=0.10):
+    """List regressions of results against a saved baseline run"""
+    regressions = []
+    for group, current in results["summary"].items():
+        previous = baseline["summary"].get(group)
+        if previous is None:
+            continue
+        if current["accuracy"] < previous["accuracy"]:
+            regressions.append(f"{group}: accuracy {previous['accuracy']:.3f} -> {current['accuracy']:.3f}")
+        if current["mean_time"] > previous["mean_time"] * (1 + tolerance):
+            regressions.append(f"{group}: mean time {previous['mean_time']:.4f}s -> {current['mean_time']:.4f}s")
+        if current["peak_bytes"] and previous["peak_bytes"] and \
+                current["peak_bytes"] > previous["peak_bytes"] * (1 + tolerance):
+            regressions.append(f"{group}: peak memory {previous['peak_bytes']} -> {current['peak_bytes']} bytes")
+    return regressions
+
+
+def print_summary(results):
+    print(f"Engine: {results['engine']}")
+    print(f"{'Group':<20} {'N':>4} {'Acc':>6} {'Mean s':>9} {'Max s':>9} {'Nodes/s':>10} {'Peak KB':>9}")
+    for group, s in results["summary"].items():
+        nps = f"{s['nodes_per_sec']:.0f}" if s["nodes_per_sec"] else "-"
+        peak = f"{s['peak_bytes'] / 1024:.0f}" if s["peak_bytes"] else "-"
+        print(f"{group:<20} {s['positions']:>4} {s['accuracy']:>6.2f} {s['mean_time']:>9.4f} "
+              f"{s['max_time']:>9.4f} {nps:>10} {peak:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark engines over the reference position sets")
+    parser.add_argument("engines", nargs="*", default=["engine"], help="Player specs as in arena.py")
+    parser.add_argument("--positions", default=DEFAULT_POSITIONS)
+    parser.add_argument("--sets", nargs="*", choices=["early", "middle", "end"])
+    parser.add_argument("--difficulty", nargs="*", choices=["easy", "medium", "hard"])
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per position; the fastest counts")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--output", help="Write results as JSON (one object per engine)")
+    parser.add_argument("--baseline", help="Compare against a saved --output file and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown/memory growth")
+    args = parser.parse_args()
+
+    positions = load_positions(args.positions, args.sets, args.difficulty)
+    all_results = []
+    for spec in args.engines:
+        results = run_benchmark(spec, positions, not args.no_memory, args.repeat)
+        print_summary(results)
+        all_results.append(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(all_results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {r["engine"]: r for r in json.load(f)}
+        failed = False
+        for results in all_results:
+            if results["engine"] not in baseline:
+                continue
+            for line in compare(results, baseline[results["engine"]], args.tolerance):
+                print(f"REGRESSION {results['engine']} {line}")
+                failed = True
+        sys.exit(1 if failed else 0)
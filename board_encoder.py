@@ -0,0 +1,65 @@
+import numpy as np
+
+# Cell value (0 empty, 1, 2) -> input value, one row per perspective player
+_TABLES = np.array([[0.0, 0.0, 0.0],
+                    [0.0, 1.0, -1.0],
+                    [0.0, -1.0, 1.0]], dtype=np.float32)
+_FLAT_TABLE = _TABLES.ravel()
+
+# DQN input layout, saved with trained weights and checked when they are loaded:
+# 1 was the raw 0/1/2 board, 2 is encode_game(game, 1, turn_bit=False) (+1 player 1, -1 player 2)
+DQN_INPUT_VERSION = 2
+
+
+def input_size(rows, cols, turn_bit=True):
+    """Length of an encoded board"""
+    return rows * cols + (1 if turn_bit else 0)
+
+
+def encode(board, player, current_player=None, out=None):
+    """
+    Encode a board from player's perspective: 1.0 own piece, -1.0 opponent, 0.0 empty.
+
+    Parameters:
+        board (np.ndarray): rows x cols board of 0/1/2 cell values
+        player (int): Perspective player (1 or 2)
+        current_player (int): If given, append a turn bit (1.0 if it is player's turn, else -1.0)
+        out (np.ndarray): Optional float32 output vector to fill instead of allocating
+    """
+    cells = board.size
+    if out is None:
+        out = np.empty(cells + (current_player is not None), dtype=np.float32)
+    # Table lookup straight from the board buffer; mode='clip' lets numpy write into out unbuffered
+    np.take(_TABLES[player], board.reshape(-1), out=out[:cells], mode='clip')
+    if current_player is not None:
+        out[cells] = 1.0 if current_player == player else -1.0
+    return out
+
+
+def encode_game(game, player=None, out=None, turn_bit=True):
+    """Encode a Connect4 game, by default from the side to move's perspective"""
+    if player is None:
+        player = game.current_player
+    return encode(game.board, player, game.current_player if turn_bit else None, out)
+
+
+def encode_batch(boards, players, current_players=None, out=None):
+    """
+    Encode many boards at once.
+
+    Parameters:
+        boards (np.ndarray): (batch, rows, cols) or (batch, rows * cols) cell values
+        players (np.ndarray): (batch,) perspective player per board
+        current_players (np.ndarray): Optional (batch,) side to move, adds the turn bit column
+        out (np.ndarray): Optional (batch, inputs) float32 output array
+    """
+    boards = np.asarray(boards)
+    players = np.asarray(players)
+    flat = boards.reshape(len(boards), -1)
+    cells = flat.shape[1]
+    if out is None:
+        out = np.empty((len(boards), cells + (current_players is not None)), dtype=np.float32)
+    out[:, :cells] = _FLAT_TABLE[flat + 3 * players[:, None]]
+    if current_players is not None:
+        out[:, cells] = np.where(np.asarray(current_players) == players, 1.0, -1.0)
+    return out
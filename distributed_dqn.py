@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+import argparse
+import time
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+from baseGame import Connect4
+from board_encoder import encode_game
+from RL_agent import DQN, DQNAgent
+
+
+class TransitionRing:
+    """Single-producer/single-consumer ring buffer of transitions in shared memory"""
+
+    def __init__(self, capacity, state_size, ctx):
+        self.capacity = capacity
+        self.states = torch.zeros((capacity, state_size)).share_memory_()
+        self.next_states = torch.zeros((capacity, state_size)).share_memory_()
+        self.actions = torch.zeros(capacity, dtype=torch.long).share_memory_()
+        self.rewards = torch.zeros(capacity).share_memory_()
+        self.dones = torch.zeros(capacity).share_memory_()
+        # Monotonic counters: the actor only advances head, the learner only advances tail
+        self.head = ctx.RawValue('q', 0)
+        self.tail = ctx.RawValue('q', 0)
+
+    def put(self, state, action, reward, next_state, done):
+        """Append one transition; returns False when the ring is full"""
+        head = self.head.value
+        if head - self.tail.value >= self.capacity:
+            return False
+        i = head % self.capacity
+        self.states[i] = torch.from_numpy(state)
+        self.next_states[i] = torch.from_numpy(next_state)
+        self.actions[i] = int(action)
+        self.rewards[i] = float(reward)
+        self.dones[i] = float(done)
+        self.head.value = head + 1
+        return True
+
+    def drain(self):
+        """Yield every transition written since the last drain"""
+        tail = self.tail.value
+        head = self.head.value
+        for n in range(tail, head):
+            i = n % self.capacity
+            yield (self.states[i].numpy().copy(), int(self.actions[i]), float(self.rewards[i]),
+                   self.next_states[i].numpy().copy(), bool(self.dones[i]))
+        self.tail.value = head
+
+
+def actor_epsilon(actor_id, num_actors, base=0.4, alpha=7):
+    """Fixed per-actor exploration rate, spread from base down to near-greedy"""
+    if num_actors == 1:
+        return base
+    return base ** (1 + actor_id / (num_actors - 1) * alpha)
+
+
+def run_actor(actor_id, num_actors, ring, shared_net, weights_version, weights_lock, stop_event, seed):
+    """Self-play loop for one actor process"""
+    torch.set_num_threads(1)
+    np.random.seed(seed)
+    env = Connect4()
+    agent = DQNAgent(env.rows * env.cols, env.cols)
+    agent.device = torch.device("cpu")
+    agent.policy_net.to(agent.device)
+    agent.epsilon = actor_epsilon(actor_id, num_actors)
+    local_version = -1
+
+    while not stop_event.is_set():
+        if weights_version.value != local_version:
+            with weights_lock:
+                agent.policy_net.load_state_dict(shared_net.state_dict())
+                local_version = weights_version.value
+
+        env.reset()
+        # Player 1's fixed perspective: rewards are +1 whenever player 1 wins, so the
+        # state must not flip sides between a transition and its bootstrap target
+        state = encode_game(env, 1, turn_bit=False)
+        done = False
+        while not done and not stop_event.is_set():
+            valid_moves = env.get_valid_moves()
+            with torch.no_grad():
+                action = agent.get_action(state, valid_moves)
+            _, _, reward, done = env.make_move(action)
+            next_state = encode_game(env, 1, turn_bit=False)
+            while not ring.put(state, action, reward, next_state, done):
+                # Learner is behind; wait rather than drop transitions
+                if stop_event.is_set():
+                    return
+                time.sleep(0.001)
+            state = next_state
+
+
+def train_distributed(num_actors=4, learner_steps=10000, broadcast_every=50, update_target_every=500,
+                      memory_size=100000, ring_capacity=4096, report_every=500):
+    """Train a DQN with self-play actor processes feeding a central learner"""
+    ctx = mp.get_context("spawn")
+    env = Connect4()
+    state_size = env.rows * env.cols
+    action_size = env.cols
+    agent = DQNAgent(state_size, action_size)
+
+    shared_net = DQN(state_size, action_size)
+    shared_net.load_state_dict(agent.policy_net.state_dict())
+    shared_net.share_memory()
+    weights_version = ctx.Value('q', 0)
+    weights_lock = ctx.Lock()
+    stop_event = ctx.Event()
+    rings = [TransitionRing(ring_capacity, state_size, ctx) for _ in range(num_actors)]
+
+    actors = [ctx.Process(target=run_actor,
+                          args=(i, num_actors, rings[i], shared_net, weights_version,
+                                weights_lock, stop_event, 1000 + i),
+                          daemon=True)
+              for i in range(num_actors)]
+    for actor in actors:
+        actor.start()
+
+    transitions = 0
+    start_time = time.time()
+    step = 0
+    try:
+        while step < learner_steps:
+            for ring in rings:
+                for transition in ring.drain():
+                    agent.remember(*transition)
+                    transitions += 1
+            if len(agent.memory) > memory_size * 1.1:
+                del agent.memory[:len(agent.memory) - memory_size]
+            if len(agent.memory) < agent.batch_size:
+                time.sleep(0.01)
+                continue
+
+            agent.replay()
+            step += 1
+
+            if step % update_target_every == 0:
+                agent.update_target_network()
+            if step % broadcast_every == 0:
+                with weights_lock:
+                    shared_net.load_state_dict(agent.policy_net.state_dict())
+                    weights_version.value += 1
+            if step % report_every == 0:
+                elapsed = time.time() - start_time
+                print(f"Step: {step}, Transitions: {transitions}, "
+                      f"Env steps/sec: {transitions / elapsed:.0f}, Memory: {len(agent.memory)}")
+    finally:
+        stop_event.set()
+        for actor in actors:
+            actor.join(timeout=5)
+            if actor.is_alive():
+                actor.terminate()
+
+    return agent
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed actor/learner DQN training")
+    parser.add_argument("--actors", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=10000, help="Learner updates to run")
+    parser.add_argument("--broadcast-every", type=int, default=50)
+    parser.add_argument("--update-target-every", type=int, default=500)
+    args = parser.parse_args()
+
+    trained_agent = train_distributed(args.actors, args.steps, args.broadcast_every, args.update_target_every)
+    torch.save(trained_agent.policy_net.state_dict(), "connect4_dqn.pth")
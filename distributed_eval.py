@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+import argparse
+import multiprocessing
+import os
+import queue
+import secrets
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+import neat
+from neat_trainer import Connect4Trainer
+
+# Messages are pickled, so anyone holding the authkey can run code on the other end.
+# There is no default key, and coordinators listen on localhost unless told otherwise.
+AUTHKEY_ENV = "CONNECT4_AUTHKEY"
+
+
+def resolve_authkey(authkey=None):
+    """authkey as bytes, falling back to $CONNECT4_AUTHKEY; None if neither is set"""
+    authkey = authkey or os.environ.get(AUTHKEY_ENV)
+    if not authkey:
+        return None
+    return authkey.encode() if isinstance(authkey, str) else authkey
+
+
+def parse_address(text, default_host="localhost"):
+    """Turn 'host:port' (or just 'port') into a (host, port) tuple"""
+    host, _, port = text.rpartition(":")
+    return (host or default_host, int(port))
+
+
+class DistributedEvaluator:
+    """Coordinator that farms evaluate_genomes out to TCP workers"""
+
+    def __init__(self, config_path, address=("127.0.0.1", 6000), authkey=None,
+                 batch_size=4, timeout=300.0):
+        """
+        Parameters:
+            config_path (str): NEAT config sent to every worker on connect
+            address (tuple): (host, port) to listen on
+            authkey (bytes): Shared secret workers must present (default: $CONNECT4_AUTHKEY,
+                else a random key, printed so it can be given to the workers)
+            batch_size (int): Genomes per work message
+            timeout (float): Seconds a worker may take on one batch before it is reassigned
+        """
+        with open(config_path) as f:
+            self.config_text = f.read()
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.authkey = resolve_authkey(authkey)
+        if self.authkey is None:
+            self.authkey = secrets.token_hex(16).encode()
+            print(f"Generated worker auth key: {self.authkey.decode()} "
+                  f"(pass it to workers with --authkey or ${AUTHKEY_ENV})")
+        self.listener = Listener(address, authkey=self.authkey)
+        self.address = self.listener.address
+        self.work = queue.Queue()
+        self.cond = threading.Condition()
+        self.generation = 0
+        self.results = {}
+        self.workers = 0
+        self.closed = False
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        """Accept worker connections and give each its own serving thread"""
+        while not self.closed:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                if self.closed:
+                    return
+                continue
+            except Exception as e:
+                print(f"Rejected worker connection: {e}")
+                continue
+            threading.Thread(target=self._serve_worker, args=(conn,), daemon=True).start()
+
+    def _serve_worker(self, conn):
+        """Send batches to one worker until it dies, stalls or is told to stop"""
+        try:
+            conn.send(("config", self.config_text))
+        except OSError:
+            conn.close()
+            return
+        with self.cond:
+            self.workers += 1
+            self.cond.notify_all()
+        batch = None
+        try:
+            while True:
+                generation, batch = self.work.get()
+                if batch is None:
+                    conn.send(("stop",))
+                    return
+                if generation != self.generation:
+                    batch = None
+                    continue
+                conn.send(("evaluate", generation, batch))
+                if not conn.poll(self.timeout):
+                    raise TimeoutError(f"no reply within {self.timeout}s")
+                fitnesses = conn.recv()
+                self._record(generation, fitnesses)
+                batch = None
+        except Exception as e:
+            print(f"Worker lost ({e!r}); reassigning its batch")
+        finally:
+            if batch is not None:
+                self.work.put((generation, batch))
+            conn.close()
+            with self.cond:
+                self.workers -= 1
+
+    def _record(self, generation, fitnesses):
+        """Store results for the current generation, ignoring stale replies"""
+        with self.cond:
+            if generation != self.generation:
+                return
+            self.results.update(fitnesses)
+            self.cond.notify_all()
+
+    def evaluate_genomes(self, genomes, config):
+        """Drop-in replacement for Connect4Trainer.evaluate_genomes"""
+        with self.cond:
+            self.generation += 1
+            generation = self.generation
+            self.results = {}
+            if self.workers == 0:
+                print(f"Waiting for workers on {self.address}...")
+            self.cond.wait_for(lambda: self.workers > 0)
+
+        start = time.time()
+        for i in range(0, len(genomes), self.batch_size):
+            self.work.put((generation, genomes[i:i + self.batch_size]))
+
+        with self.cond:
+            self.cond.wait_for(lambda: len(self.results) >= len(genomes))
+            results = self.results
+
+        for genome_id, genome in genomes:
+            genome.fitness = results[genome_id]
+        best_fitness = max(genome.fitness for _, genome in genomes)
+        print(f"Evaluated {len(genomes)} genomes on {self.workers} workers in {time.time() - start:.1f}s, "
+              f"best fitness {best_fitness}")
+
+    def close(self):
+        """Tell connected workers to exit and stop listening"""
+        self.closed = True
+        with self.cond:
+            workers = self.workers
+        for _ in range(workers):
+            self.work.put((None, None))
+        self.listener.close()
+
+
+def run_worker(address, authkey=None, retry=30.0):
+    """Evaluate batches from a coordinator until it says stop or goes away"""
+    authkey = resolve_authkey(authkey)
+    if authkey is None:
+        raise ValueError(f"Workers need the coordinator's auth key (--authkey or ${AUTHKEY_ENV})")
+    deadline = time.time() + retry
+    while True:
+        try:
+            conn = Client(address, authkey=authkey)
+            break
+        except ConnectionRefusedError:
+            if time.time() > deadline:
+                raise
+            time.sleep(1.0)
+
+    trainer = Connect4Trainer()
+    config = None
+    with conn:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                return
+            if message[0] == "config":
+                # neat.Config only reads from a file
+                with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+                    f.write(message[1])
+                config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                     neat.DefaultSpeciesSet, neat.DefaultStagnation, f.name)
+                os.unlink(f.name)
+            elif message[0] == "evaluate":
+                _, _, batch = message
+                trainer.evaluate_genomes(batch, config)
+                conn.send({genome_id: genome.fitness for genome_id, genome in batch})
+            elif message[0] == "stop":
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed NEAT genome evaluation")
+    sub = parser.add_subparsers(dest="role", required=True)
+
+    coordinator = sub.add_parser("coordinator", help="Run evolution and hand genomes to workers")
+    coordinator.add_argument("--bind", default="127.0.0.1:6000",
+                             help="host:port to listen on; use 0.0.0.0:6000 for remote workers")
+    coordinator.add_argument("--authkey", help=f"Shared secret for workers (default: ${AUTHKEY_ENV}, "
+                                               "else a random key is generated and printed)")
+    coordinator.add_argument("--config", default=os.path.join(os.path.dirname(__file__), "connect4_config.txt"))
+    coordinator.add_argument("--generations", type=int, default=50)
+    coordinator.add_argument("--batch-size", type=int, default=4)
+    coordinator.add_argument("--timeout", type=float, default=300.0)
+    coordinator.add_argument("--local-workers", type=int, default=0,
+                             help="Also start this many worker processes on this host")
+
+    worker = sub.add_parser("worker", help="Evaluate genomes for a coordinator")
+    worker.add_argument("--connect", default="localhost:6000")
+    worker.add_argument("--authkey", help=f"The coordinator's auth key (default: ${AUTHKEY_ENV})")
+
+    args = parser.parse_args()
+    if args.role == "worker":
+        if resolve_authkey(args.authkey) is None:
+            parser.error(f"workers need --authkey or ${AUTHKEY_ENV}")
+        run_worker(parse_address(args.connect), args.authkey)
+        return
+
+    evaluator = DistributedEvaluator(args.config, parse_address(args.bind, "127.0.0.1"), args.authkey,
+                                     batch_size=args.batch_size, timeout=args.timeout)
+    local_address = ("localhost", evaluator.address[1])
+    workers = [multiprocessing.Process(target=run_worker, args=(local_address, evaluator.authkey),
+                                       daemon=True)
+               for _ in range(args.local_workers)]
+    for process in workers:
+        process.start()
+    try:
+        Connect4Trainer().train(args.config, evaluator.evaluate_genomes, args.generations)
+    finally:
+        evaluator.close()
+        for process in workers:
+            process.join(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+import argparse
+import numpy as np
+from board_encoder import DQN_INPUT_VERSION
+
+LAYERS = ("fc1", "fc2", "fc3")
+
+
+def check_input_version(version, model_path):
+    """Refuse weights trained on another input layout; they would load fine and play nonsense"""
+    version = 1 if version is None else int(version)  # Files from before versioning used raw cells
+    if version != DQN_INPUT_VERSION:
+        raise ValueError(f"{model_path} was trained on DQN input version {version}, "
+                         f"but states are now encoded as version {DQN_INPUT_VERSION}; retrain the model")
+
+
+def export_dqn(model_path="connect4_dqn.pth", out_path="connect4_dqn.npz", quantize=False):
+    """
+    Export a trained DQN state dict to a flat NumPy weight file.
+    quantize stores int8 weights with per-row scales: a file about a quarter of the size,
+    at no speed gain, since NumpyDQN expands them back to float32 when it loads them.
+    """
+    import torch
+
+    state_dict = torch.load(model_path, map_location="cpu")
+    check_input_version(state_dict.get("input_version"), model_path)
+    arrays = {"quantized": np.array(quantize), "input_version": np.array(DQN_INPUT_VERSION)}
+    for layer in LAYERS:
+        weight = state_dict[f"{layer}.weight"].numpy().astype(np.float32)
+        arrays[f"{layer}.bias"] = state_dict[f"{layer}.bias"].numpy().astype(np.float32)
+        if quantize:
+            # Symmetric per-output-row scales keep each neuron's weights within int8 range
+            scale = np.abs(weight).max(axis=1) / 127.0
+            scale[scale == 0] = 1.0
+            arrays[f"{layer}.weight"] = np.round(weight / scale[:, None]).astype(np.int8)
+            arrays[f"{layer}.scale"] = scale.astype(np.float32)
+        else:
+            arrays[f"{layer}.weight"] = weight
+    np.savez(out_path, **arrays)
+    return out_path
+
+
+class NumpyDQN:
+    """Torch-free inference for RL_agent.DQN with the DQNAgent.get_action contract"""
+
+    def __init__(self, weight_path="connect4_dqn.npz"):
+        with np.load(weight_path) as data:
+            check_input_version(data["input_version"] if "input_version" in data.files else None, weight_path)
+            self.quantized = bool(data["quantized"])
+            self.layers = []
+            for layer in LAYERS:
+                weight = data[f"{layer}.weight"].astype(np.float32)
+                if self.quantized:
+                    # Dequantize once here: NumPy has no fast int8 matmul, and float32 @ int8
+                    # would convert the whole weight matrix on every call
+                    weight *= data[f"{layer}.scale"][:, None]
+                self.layers.append((weight.T.copy(), data[f"{layer}.bias"]))
+        self.state_size = self.layers[0][0].shape[0]
+        self.action_size = self.layers[-1][0].shape[1]
+
+    def q_values(self, states):
+        """Q-values for a (batch, state_size) array of states"""
+        x = np.asarray(states, dtype=np.float32).reshape(-1, self.state_size)
+        for i, (weight, bias) in enumerate(self.layers):
+            x = x @ weight
+            x += bias
+            if i < len(self.layers) - 1:
+                np.maximum(x, 0, out=x)
+        return x
+
+    def get_action(self, state, valid_moves):
+        """Greedy move among valid_moves for a single flattened state"""
+        q_values = self.q_values(state)[0]
+        return valid_moves[int(np.argmax(q_values[valid_moves]))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export connect4_dqn.pth for torch-free inference")
+    parser.add_argument("model_path", nargs="?", default="connect4_dqn.pth")
+    parser.add_argument("out_path", nargs="?", default="connect4_dqn.npz")
+    parser.add_argument("--int8", action="store_true",
+                        help="Store int8 weights with per-row scales (smaller file, same inference speed)")
+    args = parser.parse_args()
+    print(f"Wrote {export_dqn(args.model_path, args.out_path, args.int8)}")
@@ -1,8 +1,48 @@
-from baseGame import Connect4
+import numpy as np
+
+
+class SearchCancelled(Exception):
+    """Raised inside a search when its stop event is set"""
+
+
+def canonical_key(board):
+    """
+    Key shared by a board and its left/right mirror image.
+    Returns (key, mirrored); mirrored means the key was taken from the mirror image,
+    so columns stored under it must be mapped back with mirror_move.
+    The key is the raw cell bytes: caches holding boards of several sizes must add the shape.
+    """
+    board = np.asarray(board, dtype=np.int8)
+    key = board.tobytes()
+    mirror_key = board[:, ::-1].tobytes()
+    return (mirror_key, True) if mirror_key < key else (key, False)
+
+
+def mirror_move(col, cols):
+    """Column col as seen in the mirrored board"""
+    return cols - 1 - col
+
+
+def is_symmetric(board):
+    """True if the board equals its own mirror image"""
+    return bool((board == board[:, ::-1]).all())
+
+
+def search_columns(game):
+    """Columns worth searching: on a symmetric board the right half mirrors the left"""
+    if is_symmetric(game.board):
+        return range((game.cols + 1) // 2)
+    return range(game.cols)
+
 
 class Connect4Engine:
     def __init__(self):
         self.MAX_DEPTH = 2  # Maximum depth for minimax search
+        self.nodes = 0  # Positions searched, read by benchmark.py
+        self.stop_event = None  # Set by search(); checked at every node
+        self.eval_cache = {}  # (board shape, canonical board key, player) -> evaluate_position score
+        self.EVAL_CACHE_SIZE = 200000
+        self.scratch = {}  # Reusable child positions, one per search ply
         self.WEIGHTS = {
             'win': 100000,
             'three_in_row': 100,
@@ -23,42 +63,44 @@ class Connect4Engine:
 
         score = 0
         opponent = 3 - player
+        # Python lists index far faster than numpy scalars in these loops
+        board = game.board.tolist()
 
-        # Center column control
-        center_col = game.cols // 2
-        center_count = sum(1 for row in range(game.rows) if game.board[row][center_col] == player)
+        # Center column control; even widths count both middle columns so that the
+        # evaluation stays mirror-symmetric, which the canonical caches rely on
+        center_cols = {(game.cols - 1) // 2, game.cols // 2}
+        center_count = sum(1 for row in board for col in center_cols if row[col] == player)
         score += center_count * self.WEIGHTS['center_control']
 
         # Check horizontal windows
         for row in range(game.rows):
             for col in range(game.cols - 3):
-                window = [game.board[row][col + i] for i in range(4)]
+                window = [board[row][col + i] for i in range(4)]
                 score += self._evaluate_window(window, player)
 
         # Check vertical windows
         for row in range(game.rows - 3):
             for col in range(game.cols):
-                window = [game.board[row + i][col] for i in range(4)]
+                window = [board[row + i][col] for i in range(4)]
                 score += self._evaluate_window(window, player)
 
         # Check diagonal windows (positive slope)
         for row in range(game.rows - 3):
             for col in range(game.cols - 3):
-                window = [game.board[row + i][col + i] for i in range(4)]
+                window = [board[row + i][col + i] for i in range(4)]
                 score += self._evaluate_window(window, player)
 
         # Check diagonal windows (negative slope)
         for row in range(3, game.rows):
             for col in range(game.cols - 3):
-                window = [game.board[row - i][col + i] for i in range(4)]
+                window = [board[row - i][col + i] for i in range(4)]
                 score += self._evaluate_window(window, player)
 
         # Check threats
         for col in range(game.cols):
             if game.is_valid_move(col):
                 # Try opponent's move
-                game_copy = Connect4(game.rows)
-                game_copy.board = [row[:] for row in game.board]
+                game_copy = self._child(game, 'threat')
                 game_copy.current_player = opponent
                 game_copy.make_move(col)
                 if game_copy.winner == opponent:
@@ -66,6 +108,26 @@ class Connect4Engine:
 
         return score
 
+    def clear_caches(self):
+        """Drop cached evaluations and scratch positions, e.g. to time a search from cold"""
+        self.eval_cache.clear()
+        self.scratch.clear()
+
+    def _child(self, game, slot):
+        """Copy game into the reusable position for slot instead of allocating a new one"""
+        child = self.scratch[slot] = game.copy(out=self.scratch.get(slot))
+        return child
+
+    def cached_evaluation(self, game, player):
+        """evaluate_position, stored once per mirror pair since the evaluation is symmetric"""
+        key = (game.board.shape, canonical_key(game.board)[0], player)
+        score = self.eval_cache.get(key)
+        if score is None:
+            if len(self.eval_cache) >= self.EVAL_CACHE_SIZE:
+                self.eval_cache.clear()
+            score = self.eval_cache[key] = self.evaluate_position(game, player)
+        return score
+
     def _evaluate_window(self, window, player):
         """Evaluate a window of 4 positions"""
         opponent = 3 - player
@@ -79,25 +141,24 @@ class Connect4Engine:
             return self.WEIGHTS['threat']
         return 0
 
-    def get_best_move(self, game):
+    def get_best_move(self, game, depth=None):
         """Get the best move for the current position"""
+        depth = depth or self.MAX_DEPTH
         best_score = float('-inf')
         best_move = None
 
         # Prioritize center early
-        if sum(row.count(0) for row in game.board) >= game.rows * game.cols - 4:
+        if (game.board == 0).sum() >= game.rows * game.cols - 4:
             center_col = game.cols // 2
             if game.is_valid_move(center_col):
                 return center_col
 
-        # Try each possible move
-        for col in range(game.cols):
+        # Try each possible move; ties keep the leftmost column, so skipping mirrored ones changes nothing
+        for col in search_columns(game):
             if game.is_valid_move(col):
-                game_copy = Connect4(game.rows)
-                game_copy.board = [row[:] for row in game.board]
-                game_copy.current_player = game.current_player
+                game_copy = self._child(game, depth)
                 game_copy.make_move(col)
-                score = self._minimax(game_copy, self.MAX_DEPTH - 1, False,
+                score = self._minimax(game_copy, depth - 1, False,
                                       float('-inf'), float('inf'), game.current_player)
                 if score > best_score:
                     best_score = score
@@ -105,8 +166,45 @@ class Connect4Engine:
 
         return best_move
 
+    def score_moves(self, game, depth=None):
+        """Minimax score of every valid move from the side to move's perspective, as {col: score}"""
+        depth = depth or self.MAX_DEPTH
+        scores = {}
+        for col in search_columns(game):
+            if game.is_valid_move(col):
+                game_copy = self._child(game, depth)
+                game_copy.make_move(col)
+                scores[col] = self._minimax(game_copy, depth - 1, False,
+                                            float('-inf'), float('inf'), game.current_player)
+        if is_symmetric(game.board):
+            for col in list(scores):
+                scores[mirror_move(col, game.cols)] = scores[col]
+        return dict(sorted(scores.items()))
+
+    def search(self, game, max_depth=None, stop_event=None, on_depth=None):
+        """
+        Iterative deepening up to max_depth, returning the deepest completed best move.
+
+        Parameters:
+            stop_event (threading.Event): Aborts the search with SearchCancelled once set
+            on_depth (callable): Called with (depth, best_move) after each completed depth
+        """
+        self.stop_event = stop_event
+        try:
+            best_move = None
+            for depth in range(1, (max_depth or self.MAX_DEPTH) + 1):
+                best_move = self.get_best_move(game, depth)
+                if on_depth is not None:
+                    on_depth(depth, best_move)
+            return best_move
+        finally:
+            self.stop_event = None
+
     def _minimax(self, game, depth, maximizing_player, alpha, beta, engine_player):
         """Minimax algorithm with alpha-beta pruning"""
+        self.nodes += 1
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchCancelled()
         if depth == 0 or game.is_game_over():
             if game.winner == engine_player:
                 return 1000
@@ -114,15 +212,13 @@ class Connect4Engine:
                 return -1000
             elif game.is_board_full():
                 return 0
-            return self.evaluate_position(game, engine_player)
+            return self.cached_evaluation(game, engine_player)
 
         if maximizing_player:
             max_eval = float('-inf')
-            for col in range(game.cols):
+            for col in search_columns(game):
                 if game.is_valid_move(col):
-                    game_copy = Connect4(game.rows)
-                    game_copy.board = [row[:] for row in game.board]
-                    game_copy.current_player = game.current_player
+                    game_copy = self._child(game, depth)
                     game_copy.make_move(col)
                     eval = self._minimax(game_copy, depth - 1, False, alpha, beta, engine_player)
                     max_eval = max(max_eval, eval)
@@ -132,11 +228,9 @@ class Connect4Engine:
             return max_eval
         else:
             min_eval = float('inf')
-            for col in range(game.cols):
+            for col in search_columns(game):
                 if game.is_valid_move(col):
-                    game_copy = Connect4(game.rows)
-                    game_copy.board = [row[:] for row in game.board]
-                    game_copy.current_player = game.current_player
+                    game_copy = self._child(game, depth)
                     game_copy.make_move(col)
                     eval = self._minimax(game_copy, depth - 1, True, alpha, beta, engine_player)
                     min_eval = min(min_eval, eval)
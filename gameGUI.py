@@ -2,11 +2,13 @@
 
 import pygame
 import sys
+from ai_worker import AIWorker, position_key
+from analysis import PositionAnalyzer
 from baseGame import Connect4
-from engine import Connect4Engine
+from board_encoder import encode_game, input_size
 from neat_player import NEATPlayer
-from RL_agent import DQNAgent
-import torch
+from play_against_rl import load_trained_agent
+import os
 import numpy as np
 
 class Connect4GUI:
@@ -23,23 +25,37 @@ class Connect4GUI:
     HUMAN_VS_NEAT = 2
     HUMAN_VS_RL = 3
 
-    def __init__(self, n, cell_size=100):
+    # Posted by the AI worker thread when it has progress or a move
+    AI_EVENT = pygame.USEREVENT + 1
+    # Posted by the analysis thread when a deeper analysis is ready
+    ANALYSIS_EVENT = pygame.USEREVENT + 2
+
+    def __init__(self, rows=6, cols=7, cell_size=100, engine_depth=None):
         """
-        Initialize the GUI with board size n and cell size in pixels.
+        Initialize the GUI with a rows x cols board and cell size in pixels.
 
         Parameters:
-            n (int): Board size (number of rows and columns)
+            rows (int): Number of rows
+            cols (int): Number of columns
             cell_size (int): Cell size in pixels
+            engine_depth (int): Search depth for the engine opponent (default: engine's MAX_DEPTH)
         """
-        self.game = Connect4(n)
+        self.game = Connect4(rows, cols)
         self.cell_size = cell_size
         self.width = self.game.cols * cell_size
-        self.height = (self.game.rows + 1) * cell_size # Extra row for piece drop animation
-        self.engine = Connect4Engine()
+        self.panel_height = cell_size // 3  # Per-column analysis scores below the board
+        self.height = (self.game.rows + 1) * cell_size + self.panel_height # Extra row for piece drop animation
+        self.analyzer = PositionAnalyzer(
+            notify=lambda: pygame.event.post(pygame.event.Event(self.ANALYSIS_EVENT)))
+        self.analysis_target = None  # Position key the analysis thread is working on
+        self.moves = []  # Columns played so far, replayed on undo
+        # Computer moves are computed off the event loop
+        self.ai_worker = AIWorker(engine_depth, notify=lambda: pygame.event.post(pygame.event.Event(self.AI_EVENT)))
         self.game_mode = self.HUMAN_VS_HUMAN
         self.computer_player = 2
         self.show_eval = True
         self.neat_available = True
+        self.rl_state = None  # Reused input buffer for the RL agent
 
         # Initialize NEAT player
         try:
@@ -48,15 +64,27 @@ class Connect4GUI:
             print("NEAT model not found. NEAT player mode will be disabled.")
             self.neat_player = None
             self.neat_available = False
+        # The trained networks only fit the board size they were trained on
+        if self.neat_player is not None and \
+                self.neat_player.config.genome_config.num_inputs != input_size(rows, cols):
+            print(f"NEAT model was not trained on a {rows}x{cols} board. NEAT player mode will be disabled.")
+            self.neat_player = None
+            self.neat_available = False
 
         # Initialize RL player
+        # Prefer the torch-free export (see dqn_export.py) when it is present
         try:
-            self.rl_agent = DQNAgent(self.game.rows * self.game.cols, self.game.cols)
-            self.rl_agent.policy_net.load_state_dict(torch.load("connect4_dqn.pth"))
-            self.rl_agent.policy_net.eval()
-        except FileNotFoundError:
+            model_path = "connect4_dqn.npz" if os.path.exists("connect4_dqn.npz") else "connect4_dqn.pth"
+            self.rl_agent = load_trained_agent(model_path)
+        except (FileNotFoundError, ImportError):
             print("RL model not found. RL player mode will be disabled.")
             self.rl_agent = None
+        except ValueError as e:
+            print(f"{e}. RL player mode will be disabled.")
+            self.rl_agent = None
+        if self.rl_agent is not None and self.rl_agent.state_size != rows * cols:
+            print(f"RL model was not trained on a {rows}x{cols} board. RL player mode will be disabled.")
+            self.rl_agent = None
 
         # Mode display text
         self.mode_texts = {
@@ -71,8 +99,55 @@ class Connect4GUI:
         self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption('Connect 4')
         
-        # Font for text
+        # Fonts are created once; rendered text is cached in render_text
         self.font = pygame.font.Font(None, 74)
+        self.small_font = pygame.font.Font(None, 26)
+        self.eval_font = pygame.font.Font(None, 36)
+        self.text_cache = {}
+        self.build_surfaces()
+
+        # Redraw state: only the parts marked dirty are drawn and pushed to the display
+        self.hover_col = None
+        self.drawn_board = None
+        self.dirty_status = True
+        self.dirty_board = True
+        self.dirty_analysis = True
+
+    def build_surfaces(self):
+        """Pre-render the board and one cell surface per piece color"""
+        radius = self.cell_size // 2 - 5
+        center = (self.cell_size // 2, self.cell_size // 2)
+        self.cell_surfaces = {}
+        for value, color in ((0, self.BLACK), (1, self.RED), (2, self.YELLOW)):
+            cell = pygame.Surface((self.cell_size, self.cell_size))
+            cell.fill(self.BLUE)
+            pygame.draw.circle(cell, color, center, radius)
+            self.cell_surfaces[value] = cell.convert()
+
+        # Hover pieces: solid for the mouse, outlined for the computer's best move so far
+        self.hover_surfaces = {}
+        for player, color in ((1, self.RED), (2, self.YELLOW)):
+            for outline in (0, 4):
+                piece = pygame.Surface((self.cell_size, self.cell_size), pygame.SRCALPHA)
+                pygame.draw.circle(piece, color, center, radius, outline)
+                self.hover_surfaces[player, outline] = piece.convert_alpha()
+
+        self.board_surface = pygame.Surface((self.width, self.game.rows * self.cell_size)).convert()
+        self.eval_background = pygame.Surface((200, 30))
+        self.eval_background.fill(self.WHITE)
+        self.eval_background.set_alpha(230)
+        self.eval_background = self.eval_background.convert()
+        self.drawn_board = None
+
+    def render_text(self, font, text, color):
+        """Render text once and reuse the surface for identical requests"""
+        key = (id(font), text, color)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            if len(self.text_cache) > 512:
+                self.text_cache.clear()
+            surface = self.text_cache[key] = font.render(text, True, color)
+        return surface
 
     def toggle_game_mode(self):
         """Cycle through game modes. If the selected game mode is unavailable (because the NEAT or RL model isn't found), skip to the next available mode."""
@@ -87,25 +162,38 @@ class Connect4GUI:
             self.game_mode = (self.game_mode + 1) % 4
 
         # Reset the game when the mode is changed
+        self.ai_worker.clear()
         self.game.reset()
+        self.moves = []
+
+    def rl_move(self, game):
+        """Pick the RL agent's move (runs on the AI worker thread)"""
+        self.rl_state = encode_game(game, 1, self.rl_state, turn_bit=False)
+        return self.rl_agent.get_action(self.rl_state, game.get_valid_moves())
+
+    def start_computer_move(self):
+        """Hand the current position to the background AI worker"""
+        if self.game_mode == self.HUMAN_VS_ENGINE:
+            self.ai_worker.think_engine(self.game)
+        elif self.game_mode == self.HUMAN_VS_NEAT and self.neat_player:
+            self.ai_worker.think(self.game, self.neat_player.get_move)
+        elif self.game_mode == self.HUMAN_VS_RL and self.rl_agent:
+            self.ai_worker.think(self.game, self.rl_move)
 
     def draw_evaluation(self):
         """Draw the engine's evaluation of the current position"""
         if not self.show_eval:
             return
-        evaluation = self.engine.evaluate_position(self.game, self.game.current_player)
-        eval_font = pygame.font.Font(None, 36)
+        evaluation = self.analyzer.evaluation(self.game)
         eval_text = f"Eval: {evaluation:+.1f}"
-        eval_background = pygame.Surface((200, 30))
-        eval_background.fill(self.WHITE)
-        eval_background.set_alpha(230)
+        eval_background = self.eval_background
         if evaluation > 0:
             text_color = self.RED
         elif evaluation < 0:
             text_color = self.YELLOW
         else:
             text_color = self.BLACK
-        eval_surface = eval_font.render(eval_text, True, text_color)
+        eval_surface = self.render_text(self.eval_font, eval_text, text_color)
         background_rect = eval_background.get_rect(topright=(self.width - 10, 10))
         text_rect = eval_surface.get_rect(center=background_rect.center)
         self.screen.blit(eval_background, background_rect)
@@ -122,13 +210,19 @@ class Connect4GUI:
             else:
                 text = "Game Draw!"
                 color = self.BLACK
+        elif self.ai_worker.thinking:
+            dots = "." * (pygame.time.get_ticks() // 400 % 4)
+            text = f"Computer thinking{dots}"
+            color = self.RED if self.game.current_player == 1 else self.YELLOW
         else:
             text = f"Player {self.game.current_player}'s turn"
             color = self.RED if self.game.current_player == 1 else self.YELLOW
 
-        instruction_font = pygame.font.Font(None, 26)
-        instruction_text = "Press R to restart, Q to quit, M to change mode, E to toggle eval"
+        instruction_font = self.small_font
+        instruction_text = "Press R to restart, U to undo, Q to quit, M to change mode, E to toggle eval"
         mode_text = self.mode_texts[self.game_mode]
+        if self.ai_worker.thinking and self.ai_worker.best_so_far is not None:
+            mode_text += f"  |  depth {self.ai_worker.depth}, best so far: column {self.ai_worker.best_so_far}"
 
         # Add warning color for unavailable modes
         mode_color = self.BLACK
@@ -136,13 +230,13 @@ class Connect4GUI:
            (self.game_mode == self.HUMAN_VS_RL and self.rl_agent is None):
             mode_color = self.RED
 
-        text_surface = self.font.render(text, True, color)
+        text_surface = self.render_text(self.font, text, color)
         text_rect = text_surface.get_rect(
             center=(self.width // 2, self.cell_size // 3))
-        instruction_surface = instruction_font.render(instruction_text, True, self.BLACK)
+        instruction_surface = self.render_text(instruction_font, instruction_text, self.BLACK)
         instruction_rect = instruction_surface.get_rect(
             center=(self.width // 2, self.cell_size * 2 // 3))
-        mode_surface = instruction_font.render(mode_text, True, mode_color)
+        mode_surface = self.render_text(instruction_font, mode_text, mode_color)
         mode_rect = mode_surface.get_rect(
             center=(self.width // 2, self.cell_size * 0.85))
 
@@ -150,88 +244,204 @@ class Connect4GUI:
         self.screen.blit(instruction_surface, instruction_rect)
         self.screen.blit(mode_surface, mode_rect)
 
+    def draw_analysis(self):
+        """Draw the per-column scores of the deepest finished analysis below the board"""
+        panel = pygame.Rect(0, (self.game.rows + 1) * self.cell_size, self.width, self.panel_height)
+        pygame.draw.rect(self.screen, self.WHITE, panel)
+        if not self.show_eval or self.game.is_game_over():
+            return panel
+        depth, scores = self.analyzer.lookup(self.game)
+        if not scores:
+            return panel
+        best = max(scores.values())
+        player_color = self.RED if self.game.current_player == 1 else self.YELLOW
+        for col, score in scores.items():
+            color = player_color if score == best else self.BLACK
+            surface = self.render_text(self.small_font, f"{score:+.0f}", color)
+            self.screen.blit(surface, surface.get_rect(
+                center=(col * self.cell_size + self.cell_size // 2, panel.centery)))
+        depth_surface = self.render_text(self.small_font, f"d{depth}", self.BLACK)
+        self.screen.blit(depth_surface, depth_surface.get_rect(midleft=(2, panel.centery)))
+        return panel
+
+    def update_analysis(self):
+        """Point the background analysis at the current position, or stop it when it isn't wanted"""
+        wanted = self.show_eval and not self.game.is_game_over() and not self.ai_worker.thinking
+        target = position_key(self.game) if wanted else None
+        if target == self.analysis_target:
+            return
+        self.analysis_target = target
+        if target is None:
+            # Keep the engine's search from competing with the analysis for the interpreter
+            self.analyzer.cancel()
+        else:
+            self.analyzer.analyse(self.game)
+        self.dirty_analysis = True
+
+    def undo_move(self):
+        """Take back the last move, and the computer's reply before it, by replaying the history"""
+        if not self.moves:
+            return
+        self.ai_worker.cancel()
+        self.moves.pop()
+        if self.game_mode != self.HUMAN_VS_HUMAN:
+            # Back to the human's turn
+            while self.moves and len(self.moves) % 2 != self.computer_player % 2:
+                self.moves.pop()
+        self.game.reset()
+        for col in self.moves:
+            self.game.make_move(col)
+
+    def draw_hover(self):
+        """Draw the hovering piece in the top row; while the computer thinks, show its best move so far"""
+        if self.game.is_game_over():
+            return
+        if self.ai_worker.thinking:
+            col, outline = self.ai_worker.best_so_far, 4
+        else:
+            col, outline = self.hover_col, 0
+        if col is not None and 0 <= col < self.game.cols:
+            self.screen.blit(self.hover_surfaces[self.game.current_player, outline], (col * self.cell_size, 0))
+
+    def sync_board(self):
+        """Redraw only the cells that changed since the last frame; returns their screen rects"""
+        board = self.game.board
+        if self.drawn_board is None or self.drawn_board.shape != board.shape:
+            changed = np.argwhere(np.ones(board.shape, dtype=bool))
+        else:
+            changed = np.argwhere(board != self.drawn_board)
+        rects = []
+        for row, col in changed:
+            rect = pygame.Rect(col * self.cell_size, (row + 1) * self.cell_size, self.cell_size, self.cell_size)
+            self.board_surface.blit(self.cell_surfaces[int(board[row, col])],
+                                    (rect.x, rect.y - self.cell_size))
+            rects.append(rect)
+        self.drawn_board = board.copy()
+        return rects
+
+    def render(self):
+        """Draw whatever is dirty and update just those parts of the display"""
+        rects = []
+        if self.dirty_board:
+            for rect in self.sync_board():
+                self.screen.blit(self.board_surface, rect, rect.move(0, -self.cell_size))
+                rects.append(rect)
+            self.dirty_board = False
+        if self.dirty_analysis:
+            rects.append(self.draw_analysis())
+            self.dirty_analysis = False
+        if self.dirty_status:
+            self.draw_status()
+            self.draw_evaluation()
+            self.draw_hover()
+            rects.append(pygame.Rect(0, 0, self.width, self.cell_size))
+            self.dirty_status = False
+        if rects:
+            pygame.display.update(rects)
+
     def draw_board(self):
-        """Draw the game board"""
-        self.screen.fill(self.WHITE)
-        self.draw_status()
-        self.draw_evaluation()
-
-        # Draw the blue board
-        pygame.draw.rect(self.screen, self.BLUE,
-                         (0, self.cell_size, self.width, self.height - self.cell_size))
-
-        # Draw cells
-        for row in range(self.game.rows):
-            for col in range(self.game.cols):
-                # Calculate center position for the circle
-                center_x = col * self.cell_size + self.cell_size // 2
-                center_y = (row + 1) * self.cell_size + self.cell_size // 2
-
-                # Draw circle
-                color = self.BLACK  # Empty cell
-                if self.game.board[row][col] == 1:
-                    color = self.RED  # Player 1
-                elif self.game.board[row][col] == 2:
-                    color = self.YELLOW  # Player 2
-                pygame.draw.circle(self.screen, color,
-                                   (center_x, center_y),
-                                   self.cell_size // 2 - 5)
-
-        # Draw the hovering piece in the top row
-        if not self.game.is_game_over():
-            mouse_x = pygame.mouse.get_pos()[0]
+        """Draw the whole window"""
+        self.drawn_board = None
+        self.dirty_board = True
+        self.dirty_status = True
+        self.dirty_analysis = True
+        self.render()
+        pygame.display.update()
+
+    def mark_dirty(self):
+        """Flag the board, status strip and analysis panel for redrawing"""
+        self.dirty_board = True
+        self.dirty_status = True
+        self.dirty_analysis = True
+
+    def handle_event(self, event):
+        """Update game state for one event and mark what needs redrawing"""
+        if event.type == pygame.QUIT:
+            self.ai_worker.cancel()
+            self.analyzer.cancel()
+            pygame.quit()
+            sys.exit()
+
+        if event.type == pygame.MOUSEMOTION:
+            col = event.pos[0] // self.cell_size
+            if col != self.hover_col:
+                self.hover_col = col
+                self.dirty_status = True
+
+        # Ignore clicks while the computer is thinking
+        if event.type == pygame.MOUSEBUTTONDOWN and not self.game.is_game_over() \
+                and not self.ai_worker.thinking:
+            mouse_x = event.pos[0]
             col = mouse_x // self.cell_size
-            if 0 <= col < self.game.cols:
-                color = self.RED if self.game.current_player == 1 else self.YELLOW
-                pygame.draw.circle(self.screen, color,
-                                   (col * self.cell_size + self.cell_size // 2,
-                                    self.cell_size // 2),
-                                   self.cell_size // 2 - 5)
+            if self.game.is_valid_move(col):
+                self.game.make_move(col)
+                self.moves.append(col)
+                self.mark_dirty()
+                if not self.game.is_game_over() and self.game_mode != self.HUMAN_VS_HUMAN \
+                        and self.game.current_player == self.computer_player:
+                    self.start_computer_move()
 
-        pygame.display.update()
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_r:  # Reset game with 'R' key
+                self.ai_worker.clear()
+                self.game.reset()
+                self.moves = []
+                self.mark_dirty()
+            elif event.key == pygame.K_u:  # Undo with 'U' key
+                self.undo_move()
+                self.mark_dirty()
+            elif event.key == pygame.K_q:  # Quit with 'Q' key
+                self.ai_worker.cancel()
+                self.analyzer.cancel()
+                pygame.quit()
+                sys.exit()
+            elif event.key == pygame.K_m:  # Toggle game mode
+                self.toggle_game_mode()
+                self.mark_dirty()
+            elif event.key == pygame.K_e:  # Toggle evaluation display
+                self.show_eval = not self.show_eval
+                self.dirty_status = True
+                self.dirty_analysis = True
+
+        if event.type in (self.AI_EVENT, pygame.NOEVENT) and self.ai_worker.thinking:
+            # Search progress, or the timer tick that animates the thinking indicator
+            self.dirty_status = True
+
+        if event.type == self.ANALYSIS_EVENT:
+            self.dirty_analysis = True
+
+        if event.type == pygame.VIDEOEXPOSE:
+            self.drawn_board = None
+            self.mark_dirty()
+
+    def apply_computer_move(self):
+        """Play the worker's move once it is ready, then ponder on the human's time"""
+        move = self.ai_worker.poll()
+        if move is None or not self.game.is_valid_move(move):
+            return
+        self.game.make_move(move)
+        self.moves.append(move)
+        self.mark_dirty()
+        if self.game_mode == self.HUMAN_VS_ENGINE:
+            self.ai_worker.ponder(self.game)
 
     def run(self):
-        """Main game loop"""
+        """Main game loop: sleeps until an event arrives and redraws only what changed"""
+        self.hover_col = pygame.mouse.get_pos()[0] // self.cell_size
+        self.update_analysis()
+        self.draw_board()
         while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-                if event.type == pygame.MOUSEBUTTONDOWN and not self.game.is_game_over():
-                    mouse_x = event.pos[0]
-                    col = mouse_x // self.cell_size
-                    if self.game.make_move(col):
-                        if self.game.is_game_over():
-                            self.draw_board()
-                        elif self.game_mode != self.HUMAN_VS_HUMAN and self.game.current_player == self.computer_player:
-                            computer_move = None
-                            if self.game_mode == self.HUMAN_VS_ENGINE:
-                                computer_move = self.engine.get_best_move(self.game)
-                            elif self.game_mode == self.HUMAN_VS_NEAT and self.neat_player:
-                                computer_move = self.neat_player.get_move(self.game)
-                            elif self.game_mode == self.HUMAN_VS_RL and self.rl_agent:
-                                state = np.array(self.game.get_state()).flatten()
-                                valid_moves = self.game.get_valid_moves()
-                                computer_move = self.rl_agent.get_action(state, valid_moves)
-                            if computer_move is not None:
-                                self.game.make_move(computer_move)
-
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_r:  # Reset game with 'R' key
-                        self.game.reset()
-                    elif event.key == pygame.K_q:  # Quit with 'Q' key
-                        pygame.quit()
-                        sys.exit()
-                    elif event.key == pygame.K_m:  # Toggle game mode
-                        self.toggle_game_mode()
-                    elif event.key == pygame.K_e:  # Toggle evaluation display
-                        self.show_eval = not self.show_eval
-
-            self.draw_board()
-            pygame.time.wait(50)  # Small delay to prevent excessive CPU usage
+            if self.ai_worker.thinking:
+                event = pygame.event.wait(400)  # Wake up to animate the thinking indicator
+            else:
+                event = pygame.event.wait()
+            for event in [event] + pygame.event.get():
+                self.handle_event(event)
+            self.apply_computer_move()
+            self.update_analysis()
+            self.render()
 
 if __name__ == "__main__":
     # Create and run the game with a 6x7 board
-    gui_game = Connect4GUI(6)
+    gui_game = Connect4GUI(6, 7)
     gui_game.run()
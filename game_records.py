@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Append-only binary store for finished games.
+
+A store is a directory of segment files, each with an offset index beside it:
+
+    segment-000000.c4r   magic, then records back to back
+    segment-000000.idx   little-endian uint64 byte offset of every record in the segment
+
+Each record is a fixed header followed by one byte per move and optional JSON metadata:
+
+    uint16 moves, uint8 rows, uint8 cols, uint8 result, uint16 metadata length,
+    moves bytes (column numbers), metadata bytes (UTF-8 JSON)
+
+result is the winner (1 or 2), 0 for a draw, or UNFINISHED.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+from collections import namedtuple
+import numpy as np
+from baseGame import Connect4
+
+MAGIC = b"C4R1"
+UNFINISHED = 255
+_HEADER = struct.Struct("<HBBBH")
+
+GameRecord = namedtuple("GameRecord", "moves rows cols result metadata")
+
+
+def _segment_paths(directory, number):
+    base = os.path.join(directory, f"segment-{number:06d}")
+    return base + ".c4r", base + ".idx"
+
+
+def _segment_numbers(directory):
+    numbers = []
+    for name in os.listdir(directory):
+        if name.startswith("segment-") and name.endswith(".c4r"):
+            numbers.append(int(name[len("segment-"):-len(".c4r")]))
+    return sorted(numbers)
+
+
+def _read_offsets(index_path):
+    """Offsets from an index file, ignoring a partially written last entry"""
+    if not os.path.exists(index_path):
+        return np.zeros(0, dtype="<u8")
+    with open(index_path, "rb") as f:
+        raw = f.read()
+    return np.frombuffer(raw[:len(raw) - len(raw) % 8], dtype="<u8").copy()
+
+
+def _record_end(f, offset, size):
+    """End offset of the record at offset, or None if the file stops short of it"""
+    if offset + _HEADER.size > size:
+        return None
+    f.seek(offset)
+    moves, _, _, _, meta_len = _HEADER.unpack(f.read(_HEADER.size))
+    end = offset + _HEADER.size + moves + meta_len
+    return end if end <= size else None
+
+
+def _decode(data, offset):
+    count, rows, cols, result, meta_len = _HEADER.unpack_from(data, offset)
+    start = offset + _HEADER.size
+    meta = data[start + count:start + count + meta_len]
+    return GameRecord(data[start:start + count], rows, cols,
+                      None if result == 0 else result, json.loads(meta) if meta else {})
+
+
+def encode_record(moves, result, rows=6, cols=7, metadata=None):
+    """Serialize one game to bytes"""
+    moves = bytes(moves)
+    meta = json.dumps(metadata, separators=(",", ":")).encode() if metadata else b""
+    if result is None:
+        result = 0
+    return _HEADER.pack(len(moves), rows, cols, result, len(meta)) + moves + meta
+
+
+class GameRecordWriter:
+    """Appends games to the newest segment, starting a new one past segment_bytes"""
+
+    def __init__(self, directory, segment_bytes=64 << 20):
+        """
+        Parameters:
+            directory (str): Store directory, created if missing
+            segment_bytes (int): Size after which writing moves on to a new segment
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+        numbers = _segment_numbers(directory)
+        self.count = sum(len(_read_offsets(_segment_paths(directory, n)[1])) for n in numbers[:-1])
+        self.data = None
+        self.index = None
+        self._open(numbers[-1] if numbers else 0)
+
+    def _open(self, number):
+        """Open a segment for appending, first dropping any torn record left by a crash"""
+        self.number = number
+        data_path, index_path = _segment_paths(self.directory, number)
+        self.data = open(data_path, "ab+")
+        size = self.data.seek(0, os.SEEK_END)
+        offsets = _read_offsets(index_path)
+        # Records are appended in order, so only the tail can be torn: walk back from the
+        # last indexed record to one that was written in full
+        kept = len(offsets)
+        end = len(MAGIC)
+        while kept:
+            record_end = _record_end(self.data, int(offsets[kept - 1]), size)
+            if record_end is not None:
+                end = record_end
+                break
+            kept -= 1
+        if size == 0:
+            self.data.write(MAGIC)
+        elif size != end or kept != len(offsets):
+            self.data.truncate(end)
+            offsets[:kept].tofile(index_path)
+        self.data.seek(0, os.SEEK_END)
+        self.index = open(index_path, "ab")
+        self.count += kept
+
+    def append(self, moves, result, rows=6, cols=7, metadata=None):
+        """Write one game; returns its number in the store"""
+        if self.data.tell() >= self.segment_bytes:
+            self.close()
+            self._open(self.number + 1)
+        offset = self.data.tell()
+        self.data.write(encode_record(moves, result, rows, cols, metadata))
+        self.index.write(struct.pack("<Q", offset))
+        self.count += 1
+        return self.count - 1
+
+    def append_game(self, game, moves, metadata=None):
+        """Write a Connect4 game given the columns played in it"""
+        if game.winner is not None:
+            result = int(game.winner)
+        else:
+            result = 0 if game.is_game_over() else UNFINISHED
+        return self.append(moves, result, game.rows, game.cols, metadata)
+
+    def flush(self):
+        self.data.flush()
+        self.index.flush()
+
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+            self.index.close()
+            self.data = self.index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameRecordReader:
+    """Memory-maps every segment; games are decoded only when accessed"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.segments = []  # (mmap, offsets) per segment
+        starts = [0]
+        for number in _segment_numbers(directory):
+            data_path, index_path = _segment_paths(directory, number)
+            if os.path.getsize(data_path) <= len(MAGIC) or not os.path.exists(index_path):
+                continue
+            with open(data_path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if data[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{data_path} is not a game record segment")
+            offsets = _read_offsets(index_path)
+            # A live writer may have flushed an index entry before its record
+            while len(offsets) and _record_end(data, int(offsets[-1]), len(data)) is None:
+                offsets = offsets[:-1]
+            self.segments.append((data, offsets))
+            starts.append(starts[-1] + len(offsets))
+        self.starts = np.array(starts, dtype=np.int64)
+
+    def __len__(self):
+        return int(self.starts[-1])
+
+    def _locate(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("game record index out of range")
+        segment = int(np.searchsorted(self.starts, i, side="right")) - 1
+        data, offsets = self.segments[segment]
+        return data, int(offsets[i - self.starts[segment]])
+
+    def moves(self, i):
+        """Columns played in game i, without decoding its metadata"""
+        data, offset = self._locate(i)
+        count = _HEADER.unpack_from(data, offset)[0]
+        start = offset + _HEADER.size
+        return data[start:start + count]
+
+    def __getitem__(self, i):
+        return _decode(*self._locate(i))
+
+    def __iter__(self):
+        for data, offsets in self.segments:
+            for offset in offsets:
+                yield _decode(data, int(offset))
+
+    def positions(self, i):
+        """Lazily replay game i (see replay)"""
+        record = self[i]
+        return replay(record.moves, record.rows, record.cols)
+
+    def close(self):
+        for data, _ in self.segments:
+            data.close()
+        self.segments = []
+
+
+def replay(moves, rows=6, cols=7):
+    """
+    Lazily replay moves, yielding (position, move) with the position before move is played,
+    then (final position, None) once every move is in.
+    The same Connect4 object is updated in place; copy() it to keep a position.
+    """
+    game = Connect4(rows, cols)
+    for col in moves:
+        yield game, col
+        game.make_move(col)
+    yield game, None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect a game record store")
+    parser.add_argument("directory")
+    parser.add_argument("--show", type=int, nargs="*", help="Print these games")
+    args = parser.parse_args()
+
+    reader = GameRecordReader(args.directory)
+    results = {1: 0, 2: 0, None: 0, UNFINISHED: 0}
+    plies = 0
+    for record in reader:
+        results[record.result] += 1
+        plies += len(record.moves)
+    print(f"{len(reader)} games in {len(reader.segments)} segments, {plies} moves; "
+          f"player 1 wins {results[1]}, player 2 wins {results[2]}, draws {results[None]}, "
+          f"unfinished {results[UNFINISHED]}")
+    for i in args.show or []:
+        record = reader[i]
+        print(f"#{i}: {''.join(str(c) for c in record.moves)} result={record.result} {record.metadata}")
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import itertools
+import json
+import os
+import random
+import time
+from arena import create_player
+from baseGame import Connect4
+from game_records import GameRecordWriter
+
+
+# Board size limits for new games; records store rows and cols in one byte each
+MIN_BOARD = 4
+MAX_BOARD = 16
+
+_worker_players = {}
+
+
+def _compute_move(spec, rows, cols, moves):
+    """Replay moves and ask the opponent for its reply (runs in a pool worker)"""
+    player = _worker_players.get(spec)
+    if player is None:
+        # Built on first use so one missing model doesn't take the other opponents down
+        player = _worker_players[spec] = create_player(spec)
+    game = Connect4(rows, cols)
+    for col in moves:
+        game.make_move(col)
+    move = player.get_move(game)
+    return None if move is None else int(move)
+
+
+class GameSession:
+    """One game in progress; kept small since a server holds thousands of them"""
+
+    __slots__ = ("game", "opponent", "computer", "moves", "busy")
+
+    def __init__(self, game, opponent, computer):
+        self.game = game
+        self.opponent = opponent
+        self.computer = computer
+        self.moves = bytearray()  # One byte per column played
+        self.busy = False
+
+    def play(self, col):
+        self.game.make_move(col)
+        self.moves.append(col)
+
+    def to_dict(self):
+        game = self.game
+        return {"moves": list(self.moves), "to_move": game.current_player,
+                "over": game.is_game_over(),
+                "winner": None if game.winner is None else int(game.winner)}
+
+
+class ServerBusy(Exception):
+    """Raised when the move queue is full; the client should retry later"""
+
+
+class LatencyStats:
+    """Counts plus a window of recent latencies for percentile reporting"""
+
+    def __init__(self, window=10000):
+        self.samples = collections.deque(maxlen=window)
+        self.count = 0
+        self.started = time.perf_counter()
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        result = {"count": self.count, "per_sec": self.count / elapsed if elapsed else 0.0}
+        if self.samples:
+            ordered = sorted(self.samples)
+            for name, q in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+                result[name] = 1000 * ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+            result["max_ms"] = 1000 * ordered[-1]
+        return result
+
+
+class GameServer:
+    """Hosts many concurrent games over line-delimited JSON, with opponent moves on a process pool"""
+
+    def __init__(self, opponents=("random", "engine", "neat", "dqn"), workers=None,
+                 max_pending=None, max_queued=1000, max_inflight_per_client=32, records=None):
+        """
+        Parameters:
+            opponents (iterable): Player specs (see arena.create_player) clients may choose from;
+                specs that fail to load here are left out
+            workers (int): Size of the move worker pool (default: CPU count)
+            max_pending (int): Moves handed to the pool at once (default: 2 per worker)
+            max_queued (int): Moves allowed to wait for a pool slot before requests are refused
+            max_inflight_per_client (int): Requests a connection may have outstanding
+                before the server stops reading from it
+            records (str): Directory of a game record store that finished games are appended to
+        """
+        # One instance per spec, kept to vet specs up front and check board sizes against
+        self.opponents = {}
+        for spec in opponents:
+            try:
+                self.opponents[spec] = create_player(spec)
+            except Exception as e:
+                print(f"Opponent '{spec}' is unavailable and will not be offered: {e}")
+        if not self.opponents:
+            raise ValueError("None of the opponents could be loaded")
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.workers
+        self.max_queued = max_queued
+        self.max_inflight_per_client = max_inflight_per_client
+        self.pool = None
+        self.slots = None
+        self.queued = 0
+        self.sessions = {}
+        self.session_ids = itertools.count(1)
+        self.connections = 0
+        self.sessions_created = 0
+        self.rejected = 0
+        self.errors = 0
+        self.request_stats = LatencyStats()
+        self.move_stats = LatencyStats()
+        self.records = GameRecordWriter(records) if records else None
+
+    def start(self):
+        """Create the worker pool; call from inside the event loop"""
+        if self.pool is None:
+            self.pool = concurrent.futures.ProcessPoolExecutor(self.workers)
+            self.slots = asyncio.Semaphore(self.max_pending)
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        if self.records is not None:
+            self.records.close()
+
+    def check_capacity(self):
+        """Refuse work up front, before any state changes, once the move queue is full"""
+        if self.queued >= self.max_queued:
+            self.rejected += 1
+            raise ServerBusy("server busy, retry later")
+
+    async def computer_move(self, session):
+        """Have the session's opponent play, waiting for a pool slot"""
+        game = session.game
+        self.queued += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.queued -= 1
+        try:
+            start = time.perf_counter()
+            move = await asyncio.get_running_loop().run_in_executor(
+                self.pool, _compute_move, session.opponent, game.rows, game.cols, bytes(session.moves))
+            self.move_stats.add(time.perf_counter() - start)
+        except Exception:
+            self.errors += 1
+            move = None
+        finally:
+            self.slots.release()
+        if move is None or not game.is_valid_move(move):
+            # A broken opponent plays a random move rather than wedging the session
+            move = random.choice(game.get_valid_moves())
+        session.play(move)
+        return move
+
+    async def op_new(self, request, owned):
+        opponent = request.get("opponent", "engine")
+        if opponent not in self.opponents:
+            raise ValueError(f"unknown opponent '{opponent}', expected one of {sorted(self.opponents)}")
+        human = int(request.get("human", 1))
+        if human not in (1, 2):
+            raise ValueError("human must be 1 or 2")
+        rows, cols = int(request.get("rows", 6)), int(request.get("cols", 7))
+        if not (MIN_BOARD <= rows <= MAX_BOARD and MIN_BOARD <= cols <= MAX_BOARD):
+            raise ValueError(f"rows and cols must be between {MIN_BOARD} and {MAX_BOARD}")
+        supports = getattr(self.opponents[opponent], "supports", None)
+        if supports is not None and not supports(rows, cols):
+            raise ValueError(f"opponent '{opponent}' does not play on a {rows}x{cols} board")
+        if human == 2:
+            self.check_capacity()
+        session = GameSession(Connect4(rows, cols), opponent, 3 - human)
+        response = {}
+        if session.computer == 1:
+            response["computer_move"] = await self.computer_move(session)
+        # Registered only once the opening move is in, so an abandoned request leaves nothing behind
+        session_id = next(self.session_ids)
+        self.sessions[session_id] = session
+        owned.add(session_id)
+        self.sessions_created += 1
+        response["session"] = session_id
+        response.update(session.to_dict())
+        return response
+
+    async def _locked_move(self, session):
+        session.busy = True
+        try:
+            return await self.computer_move(session)
+        finally:
+            session.busy = False
+
+    def _session(self, request, owned):
+        session_id = request.get("session")
+        if session_id not in owned:
+            raise ValueError(f"no session {session_id} on this connection")
+        session = self.sessions[session_id]
+        if session.busy:
+            raise ValueError("previous move still being computed")
+        return session
+
+    async def op_move(self, request, owned):
+        session = self._session(request, owned)
+        game = session.game
+        col = request.get("col")
+        if game.is_game_over():
+            raise ValueError("game is over")
+        if game.current_player == session.computer:
+            raise ValueError("not your turn")
+        if not isinstance(col, int) or not game.is_valid_move(col):
+            raise ValueError(f"invalid move {col!r}")
+        self.check_capacity()
+        session.play(col)
+        response = {}
+        if not game.is_game_over():
+            response["computer_move"] = await self._locked_move(session)
+        if game.is_game_over() and self.records is not None:
+            human = 3 - session.computer
+            self.records.append_game(game, session.moves, {"opponent": session.opponent, "human": human})
+        response.update(session.to_dict())
+        return response
+
+    async def op_state(self, request, owned):
+        return self._session(request, owned).to_dict()
+
+    async def op_close(self, request, owned):
+        session = self._session(request, owned)
+        session_id = request["session"]
+        owned.discard(session_id)
+        del self.sessions[session_id]
+        return {"closed": session_id}
+
+    async def op_metrics(self, request, owned):
+        return self.metrics()
+
+    def metrics(self):
+        return {"connections": self.connections, "sessions": len(self.sessions),
+                "sessions_created": self.sessions_created, "queued_moves": self.queued,
+                "rejected": self.rejected, "errors": self.errors,
+                "requests": self.request_stats.summary(), "moves": self.move_stats.summary()}
+
+    async def handle(self, request, owned):
+        """Answer one request dict with a response dict"""
+        start = time.perf_counter()
+        response = {"id": request.get("id")}
+        handler = getattr(self, "op_" + str(request.get("op")), None)
+        try:
+            if handler is None:
+                raise ValueError(f"unknown op {request.get('op')!r}")
+            response.update(await handler(request, owned))
+        except (ValueError, TypeError, ServerBusy) as e:
+            response["error"] = str(e)
+        except Exception as e:
+            self.errors += 1
+            response["error"] = f"internal error: {e}"
+        self.request_stats.add(time.perf_counter() - start)
+        return response
+
+    async def _handle_client(self, reader, writer):
+        """Serve one connection; requests run concurrently up to the per-client limit"""
+        self.connections += 1
+        owned = set()
+        inflight = asyncio.Semaphore(self.max_inflight_per_client)
+        pending = set()
+
+        async def answer(request):
+            try:
+                response = await self.handle(request, owned)
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+            finally:
+                inflight.release()
+
+        try:
+            while True:
+                # Stop reading while the client has too much outstanding; TCP flow control
+                # then pushes back on the sender
+                await inflight.acquire()
+                line = await reader.readline()
+                if not line:
+                    inflight.release()
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError
+                except ValueError:
+                    inflight.release()
+                    writer.write(b'{"id": null, "error": "invalid JSON"}\n')
+                    continue
+                task = asyncio.create_task(answer(request))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            for session_id in owned:
+                self.sessions.pop(session_id, None)
+            writer.close()
+
+    async def serve(self, host=None, port=None, path=None):
+        """Serve on a Unix socket if path is given, else on TCP host:port, until cancelled"""
+        self.start()
+        try:
+            if path is not None:
+                if os.path.exists(path):
+                    os.unlink(path)
+                server = await asyncio.start_unix_server(self._handle_client, path=path)
+            else:
+                server = await asyncio.start_server(self._handle_client, host, port)
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.shutdown()
+
+
+class GameClient:
+    """Async client for a GameServer; several requests may be in flight at once"""
+
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.next_id = 0
+        self.pending = {}
+        self._reader_task = None
+
+    async def connect(self, host=None, port=None, path=None):
+        if path is not None:
+            self.reader, self.writer = await asyncio.open_unix_connection(path)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(host, port)
+        self._reader_task = asyncio.create_task(self._read_responses())
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+
+    async def _read_responses(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.pending.pop(response.get("id"), None)
+            if future is not None:
+                future.set_result(response)
+        for future in self.pending.values():
+            future.set_exception(ConnectionError("Game server closed the connection"))
+        self.pending.clear()
+
+    async def request(self, op, **fields):
+        """Send one request and return the response dict ("error" is set on failure)"""
+        request_id = self.next_id
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write((json.dumps({"id": request_id, "op": op, **fields}) + "\n").encode())
+        await self.writer.drain()
+        return await future
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Connect 4 server speaking line-delimited JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--socket", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--opponents", nargs="+", default=["random", "engine", "neat", "dqn"],
+                        help="Player specs clients may choose, e.g. engine engine:4 neat dqn random")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-pending", type=int, default=None, help="Moves computed at once")
+    parser.add_argument("--max-queued", type=int, default=1000,
+                        help="Moves waiting for a worker before requests are refused")
+    parser.add_argument("--records", help="Store finished games in this game record directory")
+    args = parser.parse_args()
+
+    try:
+        server = GameServer(args.opponents, args.workers, args.max_pending, args.max_queued, records=args.records)
+    except ValueError as e:
+        parser.error(str(e))
+    where = args.socket or f"{args.host}:{args.port}"
+    print(f"Serving Connect 4 games on {where} against {', '.join(server.opponents)}")
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import json
+import os
+import numpy as np
+
+
+class InferenceServer:
+    """Coalesces move requests from many games into batched forward passes"""
+
+    def __init__(self, predict_batch, max_batch_size=64, max_wait=0.002, state_size=None, num_actions=None):
+        """
+        Parameters:
+            predict_batch (callable): Maps a (batch, inputs) float32 array to (batch, cols) scores
+            max_batch_size (int): Largest number of requests run in one forward pass
+            max_wait (float): Seconds to wait for more requests once one is queued
+            state_size (int): Inputs per state (default: learned from the first successful forward pass)
+            num_actions (int): Scores per state (default: learned from the first successful forward pass)
+        """
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.state_size = state_size
+        self.num_actions = num_actions
+        self.queue = None
+        self._worker = None
+        self.batches = 0
+        self.requests = 0
+
+    async def start(self):
+        """Start the batching loop on the running event loop"""
+        if self._worker is None:
+            self.queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._batch_loop())
+
+    async def stop(self):
+        """Stop the batching loop and fail any requests still queued"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        while not self.queue.empty():
+            _, _, future = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Inference server stopped"))
+
+    async def get_action(self, state, valid_moves):
+        """Queue one request and return the best valid move for it"""
+        if not valid_moves:
+            return None
+        state, valid_moves = self._validate(state, valid_moves)
+        if self._worker is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((state, valid_moves, future))
+        return await future
+
+    def _validate(self, state, valid_moves):
+        """Reject a malformed request here so it can never break a whole batch"""
+        state = np.asarray(state, dtype=np.float32).ravel()
+        if self.state_size is not None and state.size != self.state_size:
+            raise ValueError(f"state has {state.size} values, expected {self.state_size}")
+        moves = []
+        for move in valid_moves:
+            if isinstance(move, bool) or not isinstance(move, (int, np.integer)):
+                raise ValueError(f"invalid move {move!r}")
+            if move < 0 or (self.num_actions is not None and move >= self.num_actions):
+                raise ValueError(f"move {move} out of range")
+            moves.append(int(move))
+        return state, moves
+
+    async def _collect_batch(self):
+        """Wait for one request, then gather more until the batch is full or the wait runs out"""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _batch_loop(self):
+        """Run batched forward passes and hand each request its move"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            if self.state_size is None:
+                # Size not known yet: run the first request's size and fail any others,
+                # since a batch can only hold one size
+                size = batch[0][0].size
+                for state, _, future in batch:
+                    if state.size != size and not future.done():
+                        future.set_exception(ValueError(f"state has {state.size} values, expected {size}"))
+                batch = [request for request in batch if request[0].size == size]
+            try:
+                states = np.stack([state for state, _, _ in batch])
+                # Run the forward pass off the loop so new requests keep queueing meanwhile
+                scores = await loop.run_in_executor(None, self.predict_batch, states)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.requests += len(batch)
+            # Only a forward pass that worked may fix the sizes later requests are checked against
+            if self.state_size is None:
+                self.state_size = states.shape[1]
+            if self.num_actions is None:
+                self.num_actions = np.shape(scores)[1]
+            for row, (_, valid_moves, future) in zip(scores, batch):
+                if future.done():
+                    continue
+                try:
+                    best = int(np.argmax(np.asarray(row)[valid_moves]))
+                except IndexError as e:
+                    # Only possible before num_actions was known; fails just this request
+                    future.set_exception(ValueError(f"invalid moves {valid_moves}: {e}"))
+                    continue
+                future.set_result(int(valid_moves[best]))
+
+    async def _handle_client(self, reader, writer):
+        """Answer line-delimited JSON requests, several in flight per connection"""
+        pending = set()
+
+        async def answer(request):
+            try:
+                move = await self.get_action(request["state"], request["valid_moves"])
+                response = {"id": request.get("id"), "move": move}
+            except Exception as e:
+                response = {"id": request.get("id"), "error": str(e)}
+            writer.write((json.dumps(response) + "\n").encode())
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError
+                except ValueError:
+                    writer.write(b'{"id": null, "error": "invalid JSON"}\n')
+                    continue
+                task = asyncio.create_task(answer(request))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve_unix(self, path):
+        """Serve requests on a Unix socket until cancelled"""
+        await self.start()
+        if os.path.exists(path):
+            os.unlink(path)
+        server = await asyncio.start_unix_server(self._handle_client, path=path)
+        async with server:
+            await server.serve_forever()
+
+
+class InferenceClient:
+    """Client for an InferenceServer listening on a Unix socket"""
+
+    def __init__(self, path):
+        self.path = path
+        self.reader = None
+        self.writer = None
+        self.next_id = 0
+        self.pending = {}
+        self._reader_task = None
+
+    async def connect(self):
+        """Open the connection and start reading responses"""
+        self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+        self._reader_task = asyncio.create_task(self._read_responses())
+
+    async def close(self):
+        """Close the connection"""
+        self.writer.close()
+        await self.writer.wait_closed()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+
+    async def _read_responses(self):
+        """Route each response line to the request waiting on it"""
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.pending.pop(response.get("id"), None)
+            if future is None:
+                continue
+            if "error" in response:
+                future.set_exception(RuntimeError(response["error"]))
+            else:
+                future.set_result(response["move"])
+        for future in self.pending.values():
+            future.set_exception(ConnectionError("Inference server closed the connection"))
+        self.pending.clear()
+
+    async def get_action(self, state, valid_moves):
+        """Send one request and wait for its move"""
+        request_id = self.next_id
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        request = {"id": request_id,
+                   "state": np.asarray(state, dtype=float).ravel().tolist(),
+                   "valid_moves": [int(m) for m in valid_moves]}
+        self.writer.write((json.dumps(request) + "\n").encode())
+        await self.writer.drain()
+        return await future
+
+
+def dqn_predictor(agent):
+    """Batched greedy forward pass through a DQNAgent's policy network"""
+    if hasattr(agent, "q_values"):
+        # NumpyDQN exports are already batched
+        return agent.q_values
+
+    import torch
+
+    net = agent.policy_net
+    device = agent.device
+
+    def predict(states):
+        with torch.no_grad():
+            x = torch.as_tensor(states, dtype=torch.float32, device=device)
+            return net(x).cpu().numpy()
+
+    return predict
+
+
+def neat_predictor(network):
+    """Evaluate a NEAT network over a batch (neat-python has no batched activate)"""
+
+    def predict(states):
+        return np.array([network.activate(state.tolist()) for state in states], dtype=np.float32)
+
+    return predict
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve batched DQN or NEAT move requests on a Unix socket")
+    parser.add_argument("--socket", default="/tmp/connect4_inference.sock")
+    parser.add_argument("--model", choices=["dqn", "neat"], default="dqn")
+    parser.add_argument("--model-path", default="connect4_dqn.pth", help="A .pth state dict or a .npz export")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    if args.model == "dqn":
+        from play_against_rl import load_trained_agent
+        agent = load_trained_agent(args.model_path)
+        predict = dqn_predictor(agent)
+        state_size, num_actions = agent.state_size, agent.action_size
+    else:
+        from neat_player import NEATPlayer
+        player = NEATPlayer()
+        predict = neat_predictor(player.network)
+        genome_config = player.config.genome_config
+        state_size, num_actions = genome_config.num_inputs, genome_config.num_outputs
+
+    server = InferenceServer(predict, args.max_batch_size, args.max_wait_ms / 1000.0, state_size, num_actions)
+    print(f"Serving {args.model} moves on {args.socket}")
+    try:
+        asyncio.run(server.serve_unix(args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
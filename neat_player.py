@@ -3,6 +3,7 @@ import neat
 import pickle
 import numpy as np
 from baseGame import Connect4
+from board_encoder import encode_game
 
 class NEATPlayer:
     def __init__(self, config_file="connect4_config.txt", model_file="best_connect4_ai.pkl"):
@@ -23,22 +24,18 @@ class NEATPlayer:
         else:
             raise FileNotFoundError(f"No trained model found at {model_file}")
 
+        self.input_buffer = None
+
+    def supports(self, rows, cols):
+        """The network only fits the board size it was trained on: cells plus a turn bit in, a score per column out"""
+        genome_config = self.config.genome_config
+        return genome_config.num_inputs == rows * cols + 1 and genome_config.num_outputs == cols
+
     def get_board_state(self, game):
-        """Convert board state to neural network input"""
-        state = []
-        for row in game.board:
-            for cell in row:
-                if cell == 0:
-                    state.append(0.0)
-                elif cell == 2:  # NEAT player is always player 2
-                    state.append(1.0)
-                else:
-                    state.append(-1.0)
-
-        # Add turn indicator (43rd input)
-        state.append(1.0 if game.current_player == 2 else -1.0)
-
-        return state
+        """Convert board state to neural network input, from the side to move's perspective"""
+        self.input_buffer = encode_game(game, out=self.input_buffer)
+        # neat-python reads inputs element by element, which is faster from a list
+        return self.input_buffer.tolist()
 
     def get_move(self, game):
         """Get the best move according to the NEAT network"""
@@ -4,14 +4,17 @@ import os
 import pickle
 from baseGame import Connect4
 from engine import Connect4Engine
+from board_encoder import encode_game, input_size
+from visualize import StreamingReporter
 import random
 
 class Connect4Trainer:
     def __init__(self):
         self.engine = Connect4Engine()
         self.training_games = 10  # Reduced for faster generations
-        self.board_size = 6
+        self.rows, self.cols = 6, 7  # Must match num_inputs/num_outputs in the NEAT config
         self.min_fitness = -1000
+        self.input_buffer = None
 
     def evaluate_genomes(self, genomes, config):
         """Evaluate all genomes"""
@@ -27,12 +30,12 @@ class Connect4Trainer:
 
                 for game_num in range(self.training_games // 2):
                     # Play as player 1
-                    game = Connect4(self.board_size)
+                    game = Connect4(self.rows, self.cols)
                     score1 = self.play_game(game, net, 1)
                     scores.append(score1)
 
                     # Play as player 2
-                    game = Connect4(self.board_size)
+                    game = Connect4(self.rows, self.cols)
                     score2 = self.play_game(game, net, 2)
                     scores.append(score2)
 
@@ -48,23 +51,9 @@ class Connect4Trainer:
 
     def board_to_input(self, game, neat_player):
         """Convert board state to neural network input"""
-        input_array = []
-
-        # Convert board state to inputs
-        for row in range(game.rows):
-            for col in range(game.cols):
-                value = game.board[row][col]
-                if value == 0:
-                    input_array.append(0.0)
-                elif value == neat_player:
-                    input_array.append(1.0)
-                else:
-                    input_array.append(-1.0)
-
-        # Add turn indicator
-        input_array.append(1.0 if game.current_player == neat_player else -1.0)
-
-        return input_array
+        self.input_buffer = encode_game(game, neat_player, self.input_buffer)
+        # neat-python reads inputs element by element, which is faster from a list
+        return self.input_buffer.tolist()
 
     def play_game(self, game, net, neat_player):
         """Play a single game"""
@@ -119,13 +108,13 @@ class Connect4Trainer:
 
         # Calculate score
         if game.winner == neat_player:
-            return 100 + (42 - moves_made)  # Bonus for quick wins
+            return 100 + (game.rows * game.cols - moves_made)  # Bonus for quick wins
         elif game.winner == engine_player:
             return -100
         return 0  # Draw
 
-    def train(self, config_path):
-        """Train the NEAT network"""
+    def train(self, config_path, evaluate=None, generations=50):
+        """Train the NEAT network; evaluate defaults to self.evaluate_genomes"""
         try:
             # Load configuration
             config = neat.Config(
@@ -136,6 +125,12 @@ class Connect4Trainer:
                 config_path
             )
 
+            genome_config = config.genome_config
+            if (genome_config.num_inputs, genome_config.num_outputs) != (input_size(self.rows, self.cols), self.cols):
+                raise ValueError(f"NEAT config expects {genome_config.num_inputs} inputs and "
+                                 f"{genome_config.num_outputs} outputs, a {self.rows}x{self.cols} board needs "
+                                 f"{input_size(self.rows, self.cols)} and {self.cols}")
+
             # Create population
             pop = neat.Population(config)
 
@@ -143,11 +138,13 @@ class Connect4Trainer:
             pop.add_reporter(neat.StdOutReporter(True))
             stats = neat.StatisticsReporter()
             pop.add_reporter(stats)
+            # Per-generation log plus plots that are redrawn while training runs
+            pop.add_reporter(StreamingReporter())
 
             print("Starting evolution...")
 
             try:
-                winner = pop.run(self.evaluate_genomes, 50)
+                winner = pop.run(evaluate or self.evaluate_genomes, generations)
 
                 if winner:
                     print(f"Found winner with fitness: {winner.fitness}")
@@ -1,15 +1,24 @@
-import torch
-import numpy as np
 from baseGame import Connect4
-from RL_agent import DQN, DQNAgent
+from board_encoder import encode_game
+from dqn_export import NumpyDQN, check_input_version
 
 def load_trained_agent(model_path):
+    """Load a greedy DQN agent; .npz exports run without importing torch"""
+    if model_path.endswith(".npz"):
+        return NumpyDQN(model_path)
+
+    import torch
+    from RL_agent import DQNAgent
+
     env = Connect4()
     state_size = env.rows * env.cols
     action_size = env.cols
     agent = DQNAgent(state_size, action_size)
-    agent.policy_net.load_state_dict(torch.load(model_path))
+    state_dict = torch.load(model_path)
+    check_input_version(state_dict.get("input_version"), model_path)
+    agent.policy_net.load_state_dict(state_dict)
     agent.policy_net.eval()
+    agent.epsilon = 0.0
     return agent
 
 def play_against_rl():
@@ -32,7 +41,7 @@ def play_against_rl():
                     except ValueError:
                         print("Invalid input. Please enter a number between 0 and 6.")
             else:
-                state = np.array(env.get_state()).flatten()
+                state = encode_game(env, 1, turn_bit=False)
                 valid_moves = env.get_valid_moves()
                 move = agent.get_action(state, valid_moves)
 
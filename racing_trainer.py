@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+import math
+import os
+import random
+import neat
+from baseGame import Connect4
+from neat_trainer import Connect4Trainer
+
+
+class RandomOpponent:
+    """Cheapest curriculum opponent: a uniformly random valid move"""
+
+    deterministic = False
+
+    def get_best_move(self, game):
+        valid_moves = game.get_valid_moves()
+        return random.choice(valid_moves) if valid_moves else None
+
+
+class GreedyOpponent:
+    """One-ply opponent: take a win, block an immediate loss, else play randomly"""
+
+    deterministic = False
+
+    def get_best_move(self, game):
+        valid_moves = game.get_valid_moves()
+        if not valid_moves:
+            return None
+        for player in (game.current_player, 3 - game.current_player):
+            for col in valid_moves:
+                game_copy = game.copy()
+                game_copy.current_player = player
+                game_copy.make_move(col)
+                if game_copy.winner == player:
+                    return col
+        return random.choice(valid_moves)
+
+
+class RacingTrainer(Connect4Trainer):
+    """Trainer that stops evaluating hopeless genomes early and climbs an opponent curriculum"""
+
+    # Fitness offset per curriculum stage, larger than the spread of a single game score,
+    # so genomes facing a harder opponent always outrank those from earlier stages
+    STAGE_BONUS = 250
+
+    def __init__(self, top_fraction=0.25, initial_games=2, games_per_round=2, confidence=0.5,
+                 curriculum=True, promote_win_rate=0.75):
+        """
+        Parameters:
+            top_fraction (float): Share of the generation a genome must still be able to reach
+            initial_games (int): Games every genome plays before elimination starts
+            games_per_round (int): Games added to each surviving genome per racing round
+            confidence (float): Standard errors of slack given before a genome is eliminated
+            curriculum (bool): Start against random and greedy opponents before the engine
+            promote_win_rate (float): Win rate the top genomes need to move to the next opponent
+        """
+        super().__init__()
+        self.top_fraction = top_fraction
+        self.initial_games = max(2, initial_games)
+        self.games_per_round = max(2, games_per_round)
+        self.confidence = confidence
+        self.promote_win_rate = promote_win_rate
+        self.opponents = [("engine", self.engine)]
+        if curriculum:
+            self.opponents = [("random", RandomOpponent()), ("greedy", GreedyOpponent())] + self.opponents
+        self.stage = 0
+
+    def _play_games(self, net, count):
+        """Play count games alternating colors against the current opponent"""
+        scores = []
+        for i in range(count):
+            game = Connect4(self.rows, self.cols)
+            scores.append(self.play_game(game, net, 1 if i % 2 == 0 else 2))
+        return scores
+
+    def _bounds(self, scores, pooled_var):
+        """Mean with a lower and upper confidence bound"""
+        n = len(scores)
+        mean = sum(scores) / n
+        slack = self.confidence * math.sqrt(pooled_var / n)
+        return mean, mean - slack, mean + slack
+
+    def evaluate_genomes(self, genomes, config):
+        """Race genomes: extra games only go to those that could still make the top fraction"""
+        opponent_name, self.engine = self.opponents[self.stage]
+        print(f"Evaluating {len(genomes)} genomes against {opponent_name} opponent...")
+
+        nets = {}
+        scores = {}
+        for genome_id, genome in genomes:
+            try:
+                nets[genome_id] = neat.nn.FeedForwardNetwork.create(genome, config)
+                scores[genome_id] = self._play_games(nets[genome_id], self.initial_games)
+            except Exception as e:
+                print(f"Error evaluating genome {genome_id}: {e}")
+                scores[genome_id] = [self.min_fitness]
+
+        alive = set(nets)
+        top_k = max(1, math.ceil(self.top_fraction * len(genomes)))
+        while alive:
+            alive = {g for g in alive if len(scores[g]) < self.training_games}
+            # Pooled within-genome variance: per-genome estimates from two games are too noisy
+            dof = sum(len(s) - 1 for s in scores.values() if len(s) > 1)
+            ss = sum(sum((x - sum(s) / len(s)) ** 2 for x in s) for s in scores.values() if len(s) > 1)
+            if dof and ss == 0 and getattr(self.engine, "deterministic", True):
+                # Every genome repeated its results exactly against an opponent without
+                # randomness: further games cannot change anyone's fitness
+                break
+            # Once only the top fraction is left it always gets the full budget
+            if len(alive) > top_k:
+                pooled_var = max(ss / dof if dof else 0.0, 1.0)
+                bounds = {g: self._bounds(scores[g], pooled_var) for g in scores}
+                kth_lower = sorted((b[1] for b in bounds.values()), reverse=True)[top_k - 1]
+                alive = {g for g in alive if bounds[g][2] >= kth_lower}
+
+            for genome_id in alive:
+                count = min(self.games_per_round, self.training_games - len(scores[genome_id]))
+                scores[genome_id] += self._play_games(nets[genome_id], count)
+
+        offset = self.STAGE_BONUS * self.stage
+        games_played = 0
+        for genome_id, genome in genomes:
+            genome.fitness = sum(scores[genome_id]) / len(scores[genome_id]) + offset
+            games_played += len(scores[genome_id])
+        budget = len(genomes) * self.training_games
+        print(f"Played {games_played}/{budget} games ({100 * games_played / budget:.0f}% of full budget)")
+
+        best_fitness = max(genome.fitness for _, genome in genomes)
+        print(f"Best fitness in generation: {best_fitness}")
+        self._maybe_promote(scores, top_k)
+
+    def _maybe_promote(self, scores, top_k):
+        """Move to the next opponent once the top genomes reliably beat the current one"""
+        if self.stage == len(self.opponents) - 1:
+            return
+        ranked = sorted(scores.values(), key=lambda s: sum(s) / len(s), reverse=True)[:top_k]
+        wins = sum(sum(1 for x in s if x > 0) for s in ranked)
+        games = sum(len(s) for s in ranked)
+        if games and wins / games >= self.promote_win_rate:
+            self.stage += 1
+            print(f"Population beats {self.opponents[self.stage - 1][0]}; "
+                  f"switching to {self.opponents[self.stage][0]} opponent")
+
+
+if __name__ == "__main__":
+    local_dir = os.path.dirname(__file__)
+    config_path = os.path.join(local_dir, 'connect4_config.txt')
+
+    trainer = RacingTrainer()
+    winner = trainer.train(config_path)
+    if winner:
+        print('\nBest genome:\n{!s}'.format(winner))
+    else:
+        print('\nTraining failed to produce a winner')
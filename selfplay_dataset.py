@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import numpy as np
+from baseGame import Connect4
+from engine import Connect4Engine, canonical_key
+
+MANIFEST = "manifest.json"
+
+_worker = {}
+
+
+def _init_worker(depth, epsilon, max_random_plies, seed, rows, cols):
+    _worker.update(engine=Connect4Engine(), depth=depth, epsilon=epsilon,
+                   max_random_plies=max_random_plies, seed=seed, rows=rows, cols=cols)
+
+
+def position_hash(board):
+    """Stable 64-bit hash of a board (hash() is salted per process, so it can't be stored)"""
+    return int.from_bytes(hashlib.blake2b(board.tobytes(), digest_size=8).digest(), "little")
+
+
+def play_game(game_number):
+    """
+    Play one randomized self-play game and label every position with engine scores.
+    The game depends only on the seed and game_number, whichever worker plays it.
+    Returns (game_number, [(canonical board, side to move, scores, legal), ...]).
+    """
+    rng = random.Random(_worker["seed"] * 1000003 + game_number)
+    engine = _worker["engine"]
+    game = Connect4(_worker["rows"], _worker["cols"])
+    random_plies = rng.randint(0, _worker["max_random_plies"])
+    positions = []
+    ply = 0
+
+    while not game.is_game_over():
+        valid_moves = game.get_valid_moves()
+        key, mirrored = canonical_key(game.board)
+        scores = engine.score_moves(game, _worker["depth"])
+        row = np.zeros(game.cols, dtype=np.float32)
+        legal = np.zeros(game.cols, dtype=np.int8)
+        for col, score in scores.items():
+            row[col] = score
+            legal[col] = 1
+        if mirrored:
+            row, legal = row[::-1].copy(), legal[::-1].copy()
+        board = np.frombuffer(key, dtype=np.int8).reshape(game.rows, game.cols)
+        positions.append((board, game.current_player, row, legal))
+
+        if ply < random_plies or rng.random() < _worker["epsilon"]:
+            move = rng.choice(valid_moves)
+        else:
+            best = max(scores.values())
+            move = rng.choice([col for col, score in scores.items() if score == best])
+        game.make_move(move)
+        ply += 1
+
+    return game_number, positions
+
+
+class ShardWriter:
+    """
+    Buffers labelled positions and writes them as numbered shards listed in a manifest.
+    Each shard has a sorted keys file of position hashes beside it, memory-mapped for
+    deduplication, so memory use doesn't grow with the size of the dataset.
+    """
+
+    def __init__(self, out_dir, rows, cols, depth, shard_size):
+        self.out_dir = out_dir
+        self.shard_size = shard_size
+        os.makedirs(out_dir, exist_ok=True)
+        self.manifest_path = os.path.join(out_dir, MANIFEST)
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+            if (self.manifest["rows"], self.manifest["cols"]) != (rows, cols):
+                raise ValueError(f"{out_dir} holds a {self.manifest['rows']}x{self.manifest['cols']} dataset")
+            if self.manifest["depth"] != depth:
+                raise ValueError(f"{out_dir} is labelled at depth {self.manifest['depth']}, not {depth}")
+        else:
+            self.manifest = {"rows": rows, "cols": cols, "depth": depth, "next_game": 0,
+                             "positions": 0, "shards": []}
+        self.rows, self.cols = rows, cols
+        self.keys = [self._shard_keys(shard["name"]) for shard in self.manifest["shards"]]
+        self.pending = set()  # Hashes of the buffered positions
+        self.buffer = []
+
+    def _shard_keys(self, name):
+        """Memory-map a shard's sorted hashes, building them for shards written without"""
+        path = os.path.join(self.out_dir, f"{name}-keys.npy")
+        if not os.path.exists(path):
+            boards = _load_shard(self.out_dir, name)[0]
+            np.save(path, np.sort(np.array([position_hash(b) for b in boards], dtype=np.uint64)))
+        return np.load(path, mmap_mode="r")
+
+    def _stored(self, h):
+        """True if a committed shard holds the position with hash h"""
+        h = np.uint64(h)
+        for keys in self.keys:
+            i = np.searchsorted(keys, h)
+            if i < len(keys) and keys[i] == h:
+                return True
+        return False
+
+    def shards(self):
+        """Memory-map each committed shard as (boards, players, scores, legal)"""
+        for shard in self.manifest["shards"]:
+            yield _load_shard(self.out_dir, shard["name"])
+
+    def add(self, game_number, positions):
+        """Queue one game's positions, skipping any already stored"""
+        for position in positions:
+            h = position_hash(position[0])
+            if h not in self.pending and not self._stored(h):
+                self.pending.add(h)
+                self.buffer.append(position)
+        if len(self.buffer) >= self.shard_size:
+            self.flush(game_number + 1)
+
+    def flush(self, next_game):
+        """Write the buffer as a shard and record that games before next_game are done"""
+        if self.buffer:
+            name = f"shard-{len(self.manifest['shards']):05d}"
+            base = os.path.join(self.out_dir, name)
+            np.save(base + "-boards.npy", np.stack([p[0] for p in self.buffer]))
+            np.save(base + "-players.npy", np.array([p[1] for p in self.buffer], dtype=np.int8))
+            np.save(base + "-scores.npy", np.stack([p[2] for p in self.buffer]))
+            np.save(base + "-legal.npy", np.stack([p[3] for p in self.buffer]))
+            np.save(base + "-keys.npy", np.array(sorted(self.pending), dtype=np.uint64))
+            self.keys.append(np.load(base + "-keys.npy", mmap_mode="r"))
+            self.manifest["shards"].append({"name": name, "count": len(self.buffer)})
+            self.manifest["positions"] += len(self.buffer)
+            self.buffer = []
+            self.pending = set()
+        self.manifest["next_game"] = next_game
+        # Shards first, manifest last and atomically: a crash loses at most the unlisted shard
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+
+
+def _load_shard(out_dir, name):
+    base = os.path.join(out_dir, name)
+    return tuple(np.load(f"{base}-{part}.npy", mmap_mode="r") for part in ("boards", "players", "scores", "legal"))
+
+
+def load_dataset(out_dir):
+    """Concatenate every shard into (boards, players, scores, legal) arrays"""
+    with open(os.path.join(out_dir, MANIFEST)) as f:
+        manifest = json.load(f)
+    parts = [_load_shard(out_dir, shard["name"]) for shard in manifest["shards"]]
+    if not parts:
+        rows, cols = manifest["rows"], manifest["cols"]
+        return (np.zeros((0, rows, cols), np.int8), np.zeros(0, np.int8),
+                np.zeros((0, cols), np.float32), np.zeros((0, cols), np.int8))
+    return tuple(np.concatenate([p[i] for p in parts]) for i in range(4))
+
+
+def generate(out_dir, games, depth=4, workers=None, shard_size=100000, epsilon=0.25,
+             max_random_plies=8, seed=0, rows=6, cols=7, report_every=1000):
+    """
+    Generate labelled positions from self-play games, resuming where a previous run stopped.
+
+    Parameters:
+        games (int): Total number of games the dataset should cover
+        depth (int): Engine search depth used to score every column
+        shard_size (int): Positions per shard (bounds the buffered memory)
+        epsilon (float): Chance of a random move after the opening
+        max_random_plies (int): Each game opens with up to this many random moves
+        seed (int): Games are seeded from this and their number, so reruns are reproducible
+    """
+    writer = ShardWriter(out_dir, rows, cols, depth, shard_size)
+    start = writer.manifest["next_game"]
+    if start >= games:
+        print(f"{out_dir} already covers {start} games ({writer.manifest['positions']} positions)")
+        return writer.manifest
+    print(f"Generating games {start}..{games - 1} ({writer.manifest['positions']} positions so far)")
+
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(depth, epsilon, max_random_plies, seed, rows, cols)) as pool:
+        # imap keeps results in game order, so next_game in the manifest is always exact
+        for game_number, positions in pool.imap(play_game, range(start, games), chunksize=8):
+            writer.add(game_number, positions)
+            if (game_number + 1) % report_every == 0:
+                print(f"Games: {game_number + 1}, Positions: "
+                      f"{writer.manifest['positions'] + len(writer.buffer)}")
+        writer.flush(games)
+    print(f"Done: {writer.manifest['positions']} positions in {len(writer.manifest['shards'])} shards")
+    return writer.manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate an engine-labelled Connect 4 position dataset")
+    parser.add_argument("out_dir")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=100000)
+    parser.add_argument("--epsilon", type=float, default=0.25)
+    parser.add_argument("--random-plies", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate(args.out_dir, args.games, args.depth, args.workers, args.shard_size, args.epsilon,
+             args.random_plies, args.seed)
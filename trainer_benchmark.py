@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+import argparse
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import random
+import time
+import neat
+import numpy as np
+from neat_trainer import Connect4Trainer
+
+
+class _TimedEngine:
+    """Wraps an engine and accumulates time spent in get_best_move"""
+
+    def __init__(self, engine, timings):
+        self.engine = engine
+        self.timings = timings
+
+    def get_best_move(self, game):
+        start = time.perf_counter()
+        try:
+            return self.engine.get_best_move(game)
+        finally:
+            self.timings["engine"] += time.perf_counter() - start
+
+    def __getattr__(self, name):
+        return getattr(self.engine, name)
+
+
+class _TimedNetwork:
+    """Wraps a NEAT network and accumulates time spent in activate"""
+
+    def __init__(self, net, timings):
+        self.net = net
+        self.timings = timings
+
+    def activate(self, inputs):
+        start = time.perf_counter()
+        try:
+            return self.net.activate(inputs)
+        finally:
+            self.timings["activate"] += time.perf_counter() - start
+
+
+class BenchmarkTrainer(Connect4Trainer):
+    """Connect4Trainer that counts work and times each component of evaluation"""
+
+    def __init__(self):
+        super().__init__()
+        self.timings = {"engine": 0.0, "activate": 0.0, "board_to_input": 0.0, "evaluate": 0.0}
+        self.counts = {"generations": 0, "genomes": 0, "games": 0, "moves": 0}
+        self.engine = _TimedEngine(self.engine, self.timings)
+
+    def evaluate_genomes(self, genomes, config):
+        start = time.perf_counter()
+        super().evaluate_genomes(genomes, config)
+        self.timings["evaluate"] += time.perf_counter() - start
+        self.counts["generations"] += 1
+        self.counts["genomes"] += len(genomes)
+
+    def board_to_input(self, game, neat_player):
+        start = time.perf_counter()
+        try:
+            return super().board_to_input(game, neat_player)
+        finally:
+            self.timings["board_to_input"] += time.perf_counter() - start
+
+    def play_game(self, game, net, neat_player):
+        score = super().play_game(game, _TimedNetwork(net, self.timings), neat_player)
+        self.counts["games"] += 1
+        self.counts["moves"] += int(np.count_nonzero(game.board))
+        return score
+
+
+def run_training_benchmark(config_path, generations=5, seed=0, pop_size=None, training_games=None,
+                           profile_path=None, profile_top=25):
+    """Run a fixed, seeded number of generations and return throughput figures"""
+    random.seed(seed)
+    np.random.seed(seed)
+
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                         neat.DefaultSpeciesSet, neat.DefaultStagnation, config_path)
+    if pop_size is not None:
+        config.pop_size = pop_size
+    # Never stop early: a benchmark must always do the same amount of work
+    config.no_fitness_termination = True
+
+    trainer = BenchmarkTrainer()
+    if training_games is not None:
+        trainer.training_games = training_games
+    pop = neat.Population(config)
+
+    profiler = cProfile.Profile() if profile_path else None
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    pop.run(trainer.evaluate_genomes, generations)
+    if profiler:
+        profiler.disable()
+    wall = time.perf_counter() - start
+
+    t = trainer.timings
+    c = trainer.counts
+    other = t["evaluate"] - t["engine"] - t["activate"] - t["board_to_input"]
+    results = {
+        "python": platform.python_version(),
+        "seed": seed,
+        "generations": c["generations"],
+        "pop_size": config.pop_size,
+        "training_games": trainer.training_games,
+        "wall_time": wall,
+        "counts": c,
+        "throughput": {
+            "genomes_per_sec": c["genomes"] / wall,
+            "games_per_sec": c["games"] / wall,
+            "moves_per_sec": c["moves"] / wall,
+        },
+        "breakdown": {
+            "engine": t["engine"],
+            "activate": t["activate"],
+            "board_to_input": t["board_to_input"],
+            "evaluation_other": other,
+            "reproduction_and_reporting": wall - t["evaluate"],
+        },
+    }
+
+    if profiler:
+        profiler.dump_stats(profile_path)
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(profile_top)
+        results["profile"] = {"path": profile_path, "top": stream.getvalue()}
+    return results
+
+
+def print_results(results):
+    print(f"\n{results['generations']} generations, pop {results['pop_size']}, "
+          f"{results['counts']['games']} games in {results['wall_time']:.2f}s")
+    for name, value in results["throughput"].items():
+        print(f"  {name:<28} {value:>10.1f}")
+    print("Time breakdown:")
+    for name, seconds in results["breakdown"].items():
+        print(f"  {name:<28} {seconds:>9.2f}s {100 * seconds / results['wall_time']:>6.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark and profile NEAT training throughput")
+    parser.add_argument("--config", default=os.path.join(os.path.dirname(__file__), "connect4_config.txt"))
+    parser.add_argument("--generations", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pop-size", type=int, help="Override pop_size from the config")
+    parser.add_argument("--training-games", type=int, help="Override Connect4Trainer.training_games")
+    parser.add_argument("--profile", metavar="PATH", help="Also write cProfile stats to PATH")
+    parser.add_argument("--output", default="trainer_benchmark.json")
+    args = parser.parse_args()
+
+    results = run_training_benchmark(args.config, args.generations, args.seed, args.pop_size,
+                                     args.training_games, args.profile)
+    print_results(results)
+    if "profile" in results:
+        print(results["profile"]["top"])
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
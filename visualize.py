@@ -1,19 +1,139 @@
-import matplotlib.pyplot as plt
+import copy
+import json
+import os
+import statistics as stats_math
+import warnings
 import numpy as np
-import graphviz
+import neat
 
-def plot_stats(statistics, ylog=False, view=False, filename='avg_fitness.svg'):
-    """ Plots the population's average and best fitness. """
-    if plt is None:
-        return
+try:
+    import matplotlib.pyplot as plt
+except ImportError:
+    plt = None
+
+try:
+    import graphviz
+except ImportError:
+    graphviz = None
+
+
+class EnvelopeSeries:
+    """
+    Fixed-size summary of a growing series: at most max_points buckets of mean/min/max.
+    When full, neighbouring buckets are merged and the bucket width doubles, so memory and
+    plotting cost stay constant however many points are added.
+    """
+
+    def __init__(self, max_points=500):
+        self.max_points = max_points
+        self.width = 1  # Points per bucket
+        self.count = []
+        self.x_sum = []
+        self.y_sum = []
+        self.low = []
+        self.high = []
+
+    def add(self, x, y):
+        if self.count and self.count[-1] < self.width:
+            self.count[-1] += 1
+            self.x_sum[-1] += x
+            self.y_sum[-1] += y
+            self.low[-1] = min(self.low[-1], y)
+            self.high[-1] = max(self.high[-1], y)
+        else:
+            self.count.append(1)
+            self.x_sum.append(x)
+            self.y_sum.append(y)
+            self.low.append(y)
+            self.high.append(y)
+        if len(self.count) > self.max_points:
+            self._merge()
+
+    def _merge(self):
+        pairs = range(0, len(self.count) - 1, 2)
+        odd = len(self.count) % 2
+        self.count = [self.count[i] + self.count[i + 1] for i in pairs] + self.count[-1:] * odd
+        self.x_sum = [self.x_sum[i] + self.x_sum[i + 1] for i in pairs] + self.x_sum[-1:] * odd
+        self.y_sum = [self.y_sum[i] + self.y_sum[i + 1] for i in pairs] + self.y_sum[-1:] * odd
+        self.low = [min(self.low[i], self.low[i + 1]) for i in pairs] + self.low[-1:] * odd
+        self.high = [max(self.high[i], self.high[i + 1]) for i in pairs] + self.high[-1:] * odd
+        self.width *= 2
+
+    def arrays(self):
+        """(x, mean, min, max) arrays, one entry per bucket"""
+        count = np.array(self.count, dtype=float)
+        return (np.array(self.x_sum) / count, np.array(self.y_sum) / count,
+                np.array(self.low, dtype=float), np.array(self.high, dtype=float))
+
+
+class StackedSeries:
+    """Bucketed mean size per species, merged the same way as EnvelopeSeries"""
+
+    def __init__(self, max_points=500):
+        self.max_points = max_points
+        self.width = 1
+        self.count = []
+        self.x_sum = []
+        self.sizes = []  # Per bucket: {species id: summed size}
 
-    generation = range(len(statistics.most_fit_genomes))
-    best_fitness = [c.fitness for c in statistics.most_fit_genomes]
-    avg_fitness = np.array(statistics.get_fitness_mean())
-    stdev_fitness = np.array(statistics.get_fitness_stdev())
+    def add(self, x, sizes):
+        if self.count and self.count[-1] < self.width:
+            self.count[-1] += 1
+            self.x_sum[-1] += x
+            bucket = self.sizes[-1]
+            for key, size in sizes.items():
+                bucket[key] = bucket.get(key, 0) + size
+        else:
+            self.count.append(1)
+            self.x_sum.append(x)
+            self.sizes.append(dict(sizes))
+        if len(self.count) > self.max_points:
+            merged_sizes = []
+            for i in range(0, len(self.sizes) - 1, 2):
+                bucket = dict(self.sizes[i])
+                for key, size in self.sizes[i + 1].items():
+                    bucket[key] = bucket.get(key, 0) + size
+                merged_sizes.append(bucket)
+            odd = len(self.count) % 2
+            pairs = range(0, len(self.count) - 1, 2)
+            self.count = [self.count[i] + self.count[i + 1] for i in pairs] + self.count[-1:] * odd
+            self.x_sum = [self.x_sum[i] + self.x_sum[i + 1] for i in pairs] + self.x_sum[-1:] * odd
+            self.sizes = merged_sizes + self.sizes[-1:] * odd
+            self.width *= 2
 
-    plt.plot(generation, avg_fitness, 'b-', label="average")
-    plt.plot(generation, best_fitness, 'r-', label="best")
+    def arrays(self, max_species=20):
+        """(x, labels, curves): the largest species get their own curve, the rest are pooled"""
+        count = np.array(self.count, dtype=float)
+        totals = {}
+        for bucket in self.sizes:
+            for key, size in bucket.items():
+                totals[key] = totals.get(key, 0) + size
+        top = sorted(totals, key=totals.get, reverse=True)[:max_species]
+        curves = np.zeros((len(top) + 1, len(self.count)))
+        index = {key: i for i, key in enumerate(top)}
+        for j, bucket in enumerate(self.sizes):
+            for key, size in bucket.items():
+                curves[index.get(key, len(top)), j] += size
+        labels = [str(key) for key in top] + ["other"]
+        return np.array(self.x_sum) / count, labels, curves / count
+
+
+def _save(filename, view, dpi):
+    plt.savefig(filename, dpi=dpi)
+    if view:
+        plt.show()
+    plt.close()
+
+
+def plot_fitness_series(best, mean, ylog=False, view=False, filename='avg_fitness.png', dpi=100):
+    """Plot best and average fitness as bucket means with min/max envelopes"""
+    if plt is None:
+        return
+    for series, color, label in ((mean, 'b', "average"), (best, 'r', "best")):
+        x, y, low, high = series.arrays()
+        if series.width > 1:
+            plt.fill_between(x, low, high, color=color, alpha=0.2, linewidth=0)
+        plt.plot(x, y, color + '-', label=label)
 
     plt.title("Population's average and best fitness")
     plt.xlabel("Generations")
@@ -22,35 +142,126 @@ def plot_stats(statistics, ylog=False, view=False, filename='avg_fitness.svg'):
     plt.legend(loc="best")
     if ylog:
         plt.gca().set_yscale('symlog')
+    _save(filename, view, dpi)
 
-    plt.savefig(filename)
-    if view:
-        plt.show()
-
-    plt.close()
 
-def plot_species(statistics, view=False, filename='speciation.svg'):
-    """ Visualizes speciation throughout evolution. """
+def plot_species_series(species, view=False, filename='speciation.png', dpi=100, max_species=20):
+    """Stack plot of bucketed species sizes; species beyond max_species are pooled as 'other'"""
     if plt is None:
         return
-
-    species_sizes = statistics.get_species_sizes()
-    num_generations = len(species_sizes)
-    curves = np.array(species_sizes).T
-
+    x, labels, curves = species.arrays(max_species)
     fig, ax = plt.subplots()
-    ax.stackplot(range(num_generations), *curves)
+    if len(x):
+        ax.stackplot(x, *curves)
 
     plt.title("Speciation")
     plt.ylabel("Size per Species")
     plt.xlabel("Generations")
+    _save(filename, view, dpi)
 
-    plt.savefig(filename)
 
-    if view:
-        plt.show()
+def plot_stats(statistics, ylog=False, view=False, filename='avg_fitness.svg', max_points=500):
+    """ Plots the population's average and best fitness. """
+    if plt is None:
+        return
 
-    plt.close()
+    best, mean = EnvelopeSeries(max_points), EnvelopeSeries(max_points)
+    for generation, (genome, avg) in enumerate(zip(statistics.most_fit_genomes,
+                                                   statistics.get_fitness_mean())):
+        best.add(generation, genome.fitness)
+        mean.add(generation, avg)
+    plot_fitness_series(best, mean, ylog, view, filename)
+
+def plot_species(statistics, view=False, filename='speciation.svg', max_points=500):
+    """ Visualizes speciation throughout evolution. """
+    if plt is None:
+        return
+
+    species = StackedSeries(max_points)
+    for generation, sizes in enumerate(statistics.get_species_sizes()):
+        species.add(generation, {i: size for i, size in enumerate(sizes) if size})
+    plot_species_series(species, view, filename)
+
+
+class StreamingReporter(neat.reporting.BaseReporter):
+    """
+    Appends one compact JSON line per generation to a log while training runs and redraws
+    downsampled plots every plot_every generations.
+    """
+
+    def __init__(self, log_path='training_stats.jsonl', plot_every=10, stats_filename='avg_fitness.png',
+                 species_filename='speciation.png', max_points=500, resume=False, dpi=100):
+        """
+        Parameters:
+            log_path (str): Per-generation stats log
+            plot_every (int): Generations between plot redraws
+            max_points (int): Buckets per plotted series, whatever the number of generations
+            resume (bool): Continue an existing log instead of starting a new one
+        """
+        self.log_path = log_path
+        self.plot_every = plot_every
+        self.stats_filename = stats_filename
+        self.species_filename = species_filename
+        self.dpi = dpi
+        self.best = EnvelopeSeries(max_points)
+        self.mean = EnvelopeSeries(max_points)
+        self.species = StackedSeries(max_points)
+        self.generation = 0
+        if resume and os.path.exists(log_path):
+            for record in read_stats_log(log_path):
+                self._add(record)
+                self.generation = record["g"] + 1
+        self.log = open(log_path, 'a' if resume else 'w')
+
+    def _add(self, record):
+        self.best.add(record["g"], record["best"])
+        self.mean.add(record["g"], record["mean"])
+        self.species.add(record["g"], record["species"])
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def post_evaluate(self, config, population, species, best_genome):
+        fitnesses = [g.fitness for g in population.values() if g.fitness is not None]
+        record = {"g": self.generation, "best": best_genome.fitness,
+                  "mean": stats_math.fmean(fitnesses) if fitnesses else 0.0,
+                  "stdev": stats_math.pstdev(fitnesses) if fitnesses else 0.0,
+                  "species": {str(sid): len(s.members) for sid, s in species.species.items()}}
+        self.log.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.log.flush()
+        self._add(record)
+        if (self.generation + 1) % self.plot_every == 0:
+            self.plot()
+
+    def found_solution(self, config, generation, best):
+        self.plot()
+
+    def plot(self):
+        """Redraw both plots from the in-memory summaries"""
+        plot_fitness_series(self.best, self.mean, filename=self.stats_filename, dpi=self.dpi)
+        plot_species_series(self.species, filename=self.species_filename, dpi=self.dpi)
+
+
+def read_stats_log(log_path):
+    """Stream records from a StreamingReporter log, skipping a torn last line"""
+    with open(log_path) as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def plot_stats_log(log_path, stats_filename='avg_fitness.png', species_filename='speciation.png',
+                   max_points=500, dpi=100):
+    """Plot a stats log offline without holding the whole history in memory"""
+    best, mean, species = EnvelopeSeries(max_points), EnvelopeSeries(max_points), StackedSeries(max_points)
+    for record in read_stats_log(log_path):
+        best.add(record["g"], record["best"])
+        mean.add(record["g"], record["mean"])
+        species.add(record["g"], record["species"])
+    plot_fitness_series(best, mean, filename=stats_filename, dpi=dpi)
+    plot_species_series(species, filename=species_filename, dpi=dpi)
 
 def draw_net(config, genome, view=False, filename=None, node_names=None, show_disabled=True, prune_unused=False,
              node_colors=None, fmt='svg'):